@@ -0,0 +1,345 @@
+"""
+Level-aware, queue-backed logging for the alert checker.
+log_message only formats and enqueues; a background writer thread prints and appends
+to the log file in batches, keeping the file open between writes. The writer also
+rotates the log into gzip archives and keeps a per-run index of where each run's lines are.
+
+    python alert_logging.py [RUN_ID]   # print one run's log lines (default: the latest run)
+"""
+
+import atexit
+import glob
+import gzip
+import itertools
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Iterator, Tuple
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LOG_LEVELS = {"DEBUG": DEBUG, "INFO": INFO, "WARNING": WARNING, "ERROR": ERROR}
+
+LOG_FILE = "alert_checker.log"
+LOG_INDEX_FILE = "alert_checker.index.jsonl"  # one JSON line per run: byte ranges of its lines per log segment
+_MAX_BATCH_LINES = 1000  # lines written per file write / console flush
+
+_level = INFO
+_max_bytes = 0  # 0 disables size-based rotation
+_max_age_seconds = 0.0  # 0 disables age-based rotation
+_backup_count = 0
+_RUN_COUNTER = itertools.count(1)
+_LOG_CONTEXT = threading.local()
+
+
+def set_log_level(level: str) -> None:
+    """Set the minimum level that gets logged (DEBUG, INFO, WARNING, ERROR)."""
+    global _level
+    _level = LOG_LEVELS[level.upper()]
+
+
+def set_log_rotation(max_bytes: int, max_age_hours: float, backup_count: int) -> None:
+    """Rotate LOG_FILE once it would exceed max_bytes or its first line is older than max_age_hours; keep backup_count gzip archives."""
+    global _max_bytes, _max_age_seconds, _backup_count
+    _max_bytes = max_bytes
+    _max_age_seconds = max_age_hours * 3600
+    _backup_count = backup_count
+
+
+def log_enabled(level: int) -> bool:
+    """Cheap check for hot loops, so messages below the level aren't even formatted."""
+    return level >= _level
+
+
+class _LogWriter:
+    """
+    Single background thread draining a queue of log-line batches to stdout and LOG_FILE.
+    Rotates LOG_FILE by size/age into gzip archives and records each run's byte ranges in LOG_INDEX_FILE.
+    """
+
+    def __init__(self):
+        self._queue: "queue.Queue[Optional[object]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._file = None
+        self._file_path: Optional[str] = None
+        self._segment: Optional[str] = None  # id of the segment LOG_FILE currently holds
+        self._segment_started = 0.0
+        self._active_runs: Dict[str, Dict[str, Any]] = {}
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, entries: List[str]) -> None:
+        if not entries:
+            return
+        self._ensure_started()
+        self._queue.put(entries)
+
+    def submit_marker(self, marker: Tuple[str, str, str]) -> None:
+        """Queue a ("start"|"end", run_id, timestamp) run boundary, ordered with the log lines around it."""
+        self._ensure_started()
+        self._queue.put(marker)
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Block until everything queued so far has been written."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            lines: List[str] = []
+            while True:
+                if isinstance(item, list):
+                    lines.extend(item)
+                else:
+                    # Markers and flush events apply after the lines queued before them
+                    if lines:
+                        self._write(lines)
+                        lines = []
+                    if isinstance(item, threading.Event):
+                        item.set()
+                    else:
+                        self._handle_marker(item)
+                if len(lines) >= _MAX_BATCH_LINES:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if lines:
+                self._write(lines)
+
+    def _handle_marker(self, marker: Tuple[str, str, str]) -> None:
+        kind, run_id, timestamp = marker
+        if kind == "start":
+            self._active_runs[run_id] = {"run_id": run_id, "started": timestamp, "lines": 0, "segments": []}
+            return
+        record = self._active_runs.pop(run_id, None)
+        if record is None:
+            return
+        record["ended"] = timestamp
+        try:
+            with open(LOG_INDEX_FILE, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+        except Exception:
+            pass
+
+    def _open(self) -> None:
+        self._close_file()
+        self._file = open(LOG_FILE, "ab")
+        self._file_path = LOG_FILE
+        if self._file.tell() > 0:
+            self._segment, self._segment_started = _segment_of(LOG_FILE)
+        else:
+            self._segment = None  # assigned on first write
+
+    def _write(self, lines: List[str]) -> None:
+        text = "".join(line + "\n" for line in lines)
+        try:
+            print(text, end="", flush=True)
+        except Exception:
+            pass
+        data = text.encode("utf-8")
+        try:
+            if self._file is None or self._file_path != LOG_FILE:
+                self._open()
+            size = self._file.tell()
+            if size > 0 and (
+                (_max_bytes and size + len(data) > _max_bytes)
+                or (_max_age_seconds and time.time() - self._segment_started > _max_age_seconds)
+            ):
+                self._rotate()
+                size = self._file.tell()
+            if self._segment is None:
+                self._segment, self._segment_started = _segment_from_first_line(data.split(b"\n", 1)[0], time.time())
+            self._file.write(data)
+            self._file.flush()
+        except Exception:
+            self._close_file()
+            return
+
+        for record in self._active_runs.values():
+            segments = record["segments"]
+            if not segments or segments[-1]["segment"] != self._segment:
+                segments.append({"segment": self._segment, "start": size})
+            segments[-1]["end"] = size + len(data)
+            record["lines"] += len(lines)
+
+    def _rotate(self) -> None:
+        """Gzip the current segment to LOG_FILE.<segment>.gz, start a fresh LOG_FILE and prune old archives."""
+        segment = self._segment
+        self._close_file()
+        archive = _archive_path(segment)
+        try:
+            with open(LOG_FILE, "rb") as src, gzip.open(archive, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(LOG_FILE)
+        except Exception:
+            # Leave the segment in place rather than lose lines; retry on the next write
+            self._open()
+            return
+
+        archives = sorted(glob.glob(f"{glob.escape(LOG_FILE)}.*.gz"), key=os.path.getmtime)
+        for old_archive in archives[:-_backup_count] if _backup_count else archives:
+            try:
+                os.remove(old_archive)
+            except OSError:
+                pass
+        self._open()
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            try:
+                self._file.close()
+            except Exception:
+                pass
+        self._file = None
+        self._file_path = None
+
+
+def _segment_from_first_line(first_line: bytes, fallback_started: float) -> Tuple[str, float]:
+    """
+    Segment id and start time from a segment's first log line: its timestamp plus a checksum of the line,
+    so segments started within the same second still get distinct archive names.
+    """
+    try:
+        started = (
+            datetime.strptime(first_line[1:20].decode("ascii"), "%Y-%m-%d %H:%M:%S")
+            .replace(tzinfo=timezone.utc)
+            .timestamp()
+        )
+    except (UnicodeDecodeError, ValueError):
+        started = fallback_started
+    segment = datetime.fromtimestamp(started, timezone.utc).strftime("%Y%m%dT%H%M%S")
+    return f"{segment}-{zlib.crc32(first_line):08x}", started
+
+
+def _segment_of(path: str) -> Tuple[str, float]:
+    """Segment id and start time of an existing log file (file mtime if its first line has no timestamp)."""
+    with open(path, "rb") as f:
+        first_line = f.readline(4096).rstrip(b"\n")
+    return _segment_from_first_line(first_line, os.path.getmtime(path))
+
+
+def _archive_path(segment: Optional[str]) -> str:
+    return f"{LOG_FILE}.{segment}.gz"
+
+
+_WRITER = _LogWriter()
+
+
+def flush_logs(timeout: Optional[float] = None) -> None:
+    """Wait for the background writer to drain the queue."""
+    _WRITER.flush(timeout)
+
+
+def start_run_log() -> str:
+    """Mark the start of a run in the log index. Returns the run id to pass to end_run_log."""
+    now = datetime.now(timezone.utc)
+    run_id = f"{now.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{next(_RUN_COUNTER)}"
+    _WRITER.submit_marker(("start", run_id, now.strftime("%Y-%m-%d %H:%M:%S")))
+    return run_id
+
+
+def end_run_log(run_id: str) -> None:
+    """Close a run: its segments/byte ranges are appended to LOG_INDEX_FILE once its lines are written."""
+    _WRITER.submit_marker(("end", run_id, datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")))
+
+
+def read_run_log(run_id: Optional[str] = None) -> List[str]:
+    """Log lines of one indexed run (the most recent one if run_id is None), from LOG_FILE and its archives."""
+    record = None
+    try:
+        with open(LOG_INDEX_FILE, "r", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                if run_id is None or entry["run_id"] == run_id:
+                    record = entry
+    except (OSError, ValueError):
+        return []
+    if record is None:
+        return []
+
+    try:
+        current_segment = _segment_of(LOG_FILE)[0]
+    except OSError:
+        current_segment = None
+    data = b""
+    for part in record["segments"]:
+        opener = open if part["segment"] == current_segment else gzip.open
+        path = LOG_FILE if part["segment"] == current_segment else _archive_path(part["segment"])
+        try:
+            with opener(path, "rb") as f:
+                f.seek(part["start"])
+                data += f.read(part["end"] - part["start"])
+        except OSError:
+            continue  # segment already pruned
+    return data.decode("utf-8", "replace").splitlines()
+
+
+atexit.register(flush_logs, 10)
+
+
+def log_message(message: str, level: int = INFO) -> None:
+    """Log message to file and console (buffered per thread inside buffered_flow_log)"""
+    if level < _level:
+        return
+    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    log_entry = f"[{timestamp}] {message}"
+    buffer = getattr(_LOG_CONTEXT, "buffer", None)
+    if buffer is not None:
+        buffer.append(log_entry)
+        return
+    _WRITER.submit([log_entry])
+
+
+@contextmanager
+def buffered_flow_log() -> Iterator[None]:
+    """Collect this thread's log lines and write them as one contiguous block when the block exits."""
+    _LOG_CONTEXT.buffer = []
+    try:
+        yield
+    finally:
+        entries = _LOG_CONTEXT.buffer
+        _LOG_CONTEXT.buffer = None
+        _WRITER.submit(entries)
+
+
+def bind_flow_log(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap fn so its log lines join the calling thread's buffered_flow_log block when run on a worker thread."""
+    buffer = getattr(_LOG_CONTEXT, "buffer", None)
+
+    def bound(*args: Any, **kwargs: Any) -> Any:
+        previous = getattr(_LOG_CONTEXT, "buffer", None)
+        _LOG_CONTEXT.buffer = buffer
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _LOG_CONTEXT.buffer = previous
+
+    return bound
+
+
+if __name__ == "__main__":
+    import sys
+
+    for log_line in read_run_log(sys.argv[1] if len(sys.argv) > 1 else None):
+        print(log_line)
@@ -0,0 +1,139 @@
+"""
+Compact alert records for the matching path.
+An AlertRecord holds only the fields a stage adds (location, project, recurrence) and
+references the raw GeoEdge alert and the shared MySQL project row instead of copying
+them, while still reading like the enriched alert dict the rest of the code expects.
+"""
+
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, Optional
+
+# Enriched alert key -> project row column
+_ROW_FIELDS = {
+    "campaign_id": "campaign_id",
+    "account_id": "account_id",
+    "publisher_country": "country",
+    "publisher_name": "publisher_name",
+    "campaign_locations": "locations",
+    "region_type": "region_type",
+}
+_OWN_FIELDS = ("location_code", "location_name", "project_id", "project_name")
+_RECURRENCE_FIELDS = ("recurrence_status", "recurrence_frequency", "recurrence_streak")
+_UNSET = object()
+
+
+class AlertRecord(MutableMapping):
+    """
+    One alert after the location filter (row is None) or one alert × matched campaign row.
+    Keys resolve to, in order: fields set on the record, the campaign row, then the raw alert.
+    """
+
+    __slots__ = (
+        "raw",
+        "row",
+        "location_code",
+        "location_name",
+        "project_id",
+        "project_name",
+        "recurrence_status",
+        "recurrence_frequency",
+        "recurrence_streak",
+        "_extra",
+    )
+
+    def __init__(
+        self,
+        raw: Dict[str, Any],
+        location_code: str,
+        location_name: str,
+        project_id: str,
+        project_name: Any,
+        row: Optional[Dict[str, Any]] = None,
+    ):
+        self.raw = raw
+        self.row = row
+        self.location_code = location_code
+        self.location_name = location_name
+        self.project_id = project_id
+        self.project_name = project_name
+        self.recurrence_status = _UNSET
+        self.recurrence_frequency = _UNSET
+        self.recurrence_streak = _UNSET
+        self._extra: Optional[Dict[str, Any]] = None
+
+    def with_row(self, row: Dict[str, Any]) -> "AlertRecord":
+        """Record for this alert matched to a campaign row (shares raw alert and row, copies nothing)."""
+        return AlertRecord(self.raw, self.location_code, self.location_name, self.project_id, self.project_name, row)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _OWN_FIELDS:
+            return getattr(self, key)
+        if key in _RECURRENCE_FIELDS:
+            value = getattr(self, key)
+            if value is _UNSET:
+                raise KeyError(key)
+            return value
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        if self.row is not None:
+            if key in _ROW_FIELDS:
+                return self.row[_ROW_FIELDS[key]]
+            if key == "account_name":
+                return self.row.get("account_name", "Unknown")
+        return self.raw[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in _OWN_FIELDS or key in _RECURRENCE_FIELDS:
+            setattr(self, key, value)
+            return
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in _RECURRENCE_FIELDS and getattr(self, key) is not _UNSET:
+            setattr(self, key, _UNSET)
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)  # raw/row fields are shared and read-only
+
+    def __iter__(self) -> Iterator[str]:
+        seen = set(_OWN_FIELDS)
+        yield from _OWN_FIELDS
+        if self.row is not None:
+            for key in (*_ROW_FIELDS, "account_name"):
+                seen.add(key)
+                yield key
+        for key in _RECURRENCE_FIELDS:
+            if getattr(self, key) is not _UNSET:
+                seen.add(key)
+                yield key
+        if self._extra is not None:
+            for key in self._extra:
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+        for key in self.raw:
+            if key not in seen:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, key: object) -> bool:
+        try:
+            self[key]  # type: ignore[index]
+        except KeyError:
+            return False
+        return True
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict of the enriched alert (for JSON serialization)."""
+        return {key: self[key] for key in self}
+
+    def copy(self) -> Dict[str, Any]:
+        return self.to_dict()
+
+    def __repr__(self) -> str:
+        return f"AlertRecord({self.to_dict()!r})"
@@ -0,0 +1,461 @@
+"""
+Local SQLite store for GeoEdge alerts.
+Keeps raw alerts (the rolling ingestion window), enriched per-flow alerts,
+ingestion watermarks, cached MySQL project rows and the campaign|trigger
+recurrence history on disk so reruns and previews don't need GeoEdge/MySQL/Vertica.
+"""
+
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple
+
+from recurrence import DayRing
+
+ALERT_STORE_FILE = "alert_store.db"
+_SQLITE_IN_CHUNK = 900  # stay under SQLite's bound-parameter limit
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS raw_alerts (
+    event_key TEXT PRIMARY KEY,
+    alert_id TEXT,
+    project_id TEXT,
+    trigger_type_id TEXT NOT NULL,
+    event_ts INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    updated_at INTEGER NOT NULL,
+    backfilled INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_raw_alerts_alert_id ON raw_alerts (alert_id);
+CREATE INDEX IF NOT EXISTS idx_raw_alerts_project_id ON raw_alerts (project_id);
+CREATE INDEX IF NOT EXISTS idx_raw_alerts_event_ts ON raw_alerts (event_ts, trigger_type_id);
+
+CREATE TABLE IF NOT EXISTS enriched_alerts (
+    flow TEXT NOT NULL,
+    event_key TEXT NOT NULL,
+    campaign_id TEXT NOT NULL,
+    alert_id TEXT,
+    project_id TEXT,
+    event_ts INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    updated_at INTEGER NOT NULL,
+    PRIMARY KEY (flow, event_key, campaign_id)
+);
+CREATE INDEX IF NOT EXISTS idx_enriched_alerts_alert_id ON enriched_alerts (alert_id);
+CREATE INDEX IF NOT EXISTS idx_enriched_alerts_project_id ON enriched_alerts (project_id);
+CREATE INDEX IF NOT EXISTS idx_enriched_alerts_event_ts ON enriched_alerts (flow, event_ts);
+
+CREATE TABLE IF NOT EXISTS project_cache (
+    project_id TEXT PRIMARY KEY,
+    rows TEXT NOT NULL,
+    cached_at INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS alert_history (
+    history_key TEXT PRIMARY KEY,
+    last_seen TEXT NOT NULL,
+    last_seen_ts INTEGER NOT NULL,
+    day_counts BLOB,
+    last_day INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_alert_history_last_seen ON alert_history (last_seen_ts);
+
+CREATE TABLE IF NOT EXISTS counted_events (
+    history_key TEXT NOT NULL,
+    event_key TEXT NOT NULL,
+    event_day INTEGER NOT NULL,
+    PRIMARY KEY (history_key, event_key)
+);
+CREATE INDEX IF NOT EXISTS idx_counted_events_day ON counted_events (event_day);
+
+CREATE TABLE IF NOT EXISTS watermarks (
+    trigger_type_id TEXT NOT NULL,
+    location TEXT NOT NULL,
+    to_ts INTEGER NOT NULL,
+    PRIMARY KEY (trigger_type_id, location)
+);
+"""
+
+
+def _first_project_id(alert: Dict[str, Any]) -> Optional[str]:
+    """Project id of a raw alert ({project_id: name}) or an enriched one (plain project_id)."""
+    if alert.get("project_id"):
+        return str(alert["project_id"])
+    project_name = alert.get("project_name")
+    if isinstance(project_name, dict) and project_name:
+        return next(iter(project_name))
+    return None
+
+
+class AlertStore:
+    """
+    SQLite-backed alert store. Every call opens its own connection, so one
+    instance can be shared across threads.
+    """
+
+    def __init__(self, path: str = ALERT_STORE_FILE):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            # Stores created before recurrence counters existed
+            history_columns = {row[1] for row in conn.execute("PRAGMA table_info(alert_history)")}
+            for column, column_type in (("day_counts", "BLOB"), ("last_day", "INTEGER")):
+                if column not in history_columns:
+                    conn.execute(f"ALTER TABLE alert_history ADD COLUMN {column} {column_type}")
+            # Stores created before backfilled rows were kept out of the retention prune
+            raw_columns = {row[1] for row in conn.execute("PRAGMA table_info(raw_alerts)")}
+            if "backfilled" not in raw_columns:
+                conn.execute("ALTER TABLE raw_alerts ADD COLUMN backfilled INTEGER NOT NULL DEFAULT 0")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:  # commit on success, roll back on error
+                yield conn
+        finally:
+            conn.close()
+
+    # ---- raw alerts (rolling ingestion window) ----
+
+    def upsert_raw_alerts(self, entries: Iterable[Dict[str, Any]]) -> int:
+        """
+        Upsert raw alerts by event key.
+        Each entry is {"event_key", "trigger_type_id", "event_ts", "alert"} plus an optional "backfilled"
+        flag; backfilled rows stay flagged when a regular run refreshes them. Returns rows written.
+        """
+        now = int(time.time())
+        rows = [
+            (
+                entry["event_key"],
+                entry["alert"].get("alert_id"),
+                _first_project_id(entry["alert"]),
+                str(entry["trigger_type_id"]),
+                int(entry["event_ts"]),
+                json.dumps(entry["alert"]),
+                now,
+                1 if entry.get("backfilled") else 0,
+            )
+            for entry in entries
+        ]
+        if not rows:
+            return 0
+        with self._connect() as conn:
+            conn.executemany(
+                """
+                INSERT INTO raw_alerts (
+                    event_key, alert_id, project_id, trigger_type_id, event_ts, payload, updated_at, backfilled
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (event_key) DO UPDATE SET
+                    alert_id = excluded.alert_id,
+                    project_id = excluded.project_id,
+                    trigger_type_id = excluded.trigger_type_id,
+                    event_ts = excluded.event_ts,
+                    payload = excluded.payload,
+                    updated_at = excluded.updated_at,
+                    backfilled = MAX(raw_alerts.backfilled, excluded.backfilled)
+                """,
+                rows,
+            )
+        return len(rows)
+
+    def query_raw_alerts(
+        self,
+        start_ts: int,
+        end_ts: Optional[int] = None,
+        trigger_type_id: Optional[str] = None,
+        locations: Optional[set[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Raw alerts with start_ts <= event_ts (< end_ts), optionally for one trigger and any of the locations."""
+        return list(self.iter_raw_alerts(start_ts, end_ts, trigger_type_id, locations))
+
+    def iter_raw_alerts(
+        self,
+        start_ts: int,
+        end_ts: Optional[int] = None,
+        trigger_type_id: Optional[str] = None,
+        locations: Optional[set[str]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        query_raw_alerts as a generator: alerts are decoded one at a time from an open cursor.
+        The connection is opened on the first next(), so iterate on one thread.
+        """
+        sql = "SELECT payload FROM raw_alerts WHERE event_ts >= ?"
+        params: List[Any] = [start_ts]
+        if end_ts is not None:
+            sql += " AND event_ts < ?"
+            params.append(end_ts)
+        if trigger_type_id is not None:
+            sql += " AND trigger_type_id = ?"
+            params.append(str(trigger_type_id))
+        sql += " ORDER BY event_ts, event_key"
+
+        with self._connect() as conn:
+            for (payload,) in conn.execute(sql, params):
+                alert = json.loads(payload)
+                if locations is None or locations.intersection((alert.get("location") or {}).keys()):
+                    yield alert
+
+    def prune_raw_alerts(self, before_ts: int) -> int:
+        """Delete raw alerts older than before_ts, except backfilled ones. Returns rows deleted."""
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM raw_alerts WHERE event_ts < ? AND backfilled = 0", (before_ts,)).rowcount
+
+    # ---- watermarks ----
+
+    def get_watermarks(self, trigger_type_id: str, locations: Iterable[str]) -> Dict[str, int]:
+        """Return {location: to_ts} for the locations that have a watermark for this trigger."""
+        locations = list(locations)
+        if not locations:
+            return {}
+        placeholders = ",".join("?" * len(locations))
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT location, to_ts FROM watermarks WHERE trigger_type_id = ? AND location IN ({placeholders})",
+                [str(trigger_type_id), *locations],
+            ).fetchall()
+        return {location: to_ts for location, to_ts in rows}
+
+    def set_watermarks(self, trigger_type_id: str, locations: Iterable[str], to_ts: int) -> None:
+        with self._connect() as conn:
+            conn.executemany(
+                """
+                INSERT INTO watermarks (trigger_type_id, location, to_ts) VALUES (?, ?, ?)
+                ON CONFLICT (trigger_type_id, location) DO UPDATE SET to_ts = excluded.to_ts
+                """,
+                [(str(trigger_type_id), location, int(to_ts)) for location in locations],
+            )
+
+    # ---- enriched alerts (per flow, after matching + recurrence tagging) ----
+
+    def upsert_enriched_alerts(self, flow: str, entries: Iterable[Dict[str, Any]]) -> int:
+        """
+        Upsert enriched alerts for a flow by (event key, campaign_id).
+        Each entry is {"event_key", "event_ts", "alert"}. Returns rows written.
+        """
+        now = int(time.time())
+        rows = [
+            (
+                flow,
+                entry["event_key"],
+                str(entry["alert"].get("campaign_id")),
+                entry["alert"].get("alert_id"),
+                _first_project_id(entry["alert"]),
+                int(entry["event_ts"]),
+                json.dumps(entry["alert"], default=str),
+                now,
+            )
+            for entry in entries
+        ]
+        if not rows:
+            return 0
+        with self._connect() as conn:
+            conn.executemany(
+                """
+                INSERT INTO enriched_alerts (flow, event_key, campaign_id, alert_id, project_id, event_ts, payload, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (flow, event_key, campaign_id) DO UPDATE SET
+                    alert_id = excluded.alert_id,
+                    project_id = excluded.project_id,
+                    event_ts = excluded.event_ts,
+                    payload = excluded.payload,
+                    updated_at = excluded.updated_at
+                """,
+                rows,
+            )
+        return len(rows)
+
+    def query_enriched_alerts(
+        self,
+        flow: str,
+        start_ts: int,
+        end_ts: Optional[int] = None,
+        project_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Enriched alerts for a flow with start_ts <= event_ts (< end_ts), optionally for one project."""
+        sql = "SELECT payload FROM enriched_alerts WHERE flow = ? AND event_ts >= ?"
+        params: List[Any] = [flow, start_ts]
+        if end_ts is not None:
+            sql += " AND event_ts < ?"
+            params.append(end_ts)
+        if project_id is not None:
+            sql += " AND project_id = ?"
+            params.append(str(project_id))
+        sql += " ORDER BY event_ts, event_key, campaign_id"
+
+        with self._connect() as conn:
+            return [json.loads(row[0]) for row in conn.execute(sql, params)]
+
+    def query_alerts_by_alert_id(self, alert_id: str) -> List[Dict[str, Any]]:
+        """All raw alerts for one GeoEdge alert definition."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT payload FROM raw_alerts WHERE alert_id = ? ORDER BY event_ts", (alert_id,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def prune_enriched_alerts(self, before_ts: int) -> int:
+        """Delete enriched alerts older than before_ts. Returns rows deleted."""
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM enriched_alerts WHERE event_ts < ?", (before_ts,)).rowcount
+
+    # ---- MySQL project→campaign/publisher rows (read-through cache) ----
+
+    def get_cached_projects(self, project_ids: Iterable[str], max_age_seconds: int) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Return {project_id: rows} for project_ids cached within max_age_seconds.
+        A project cached with no rows maps to [] (known to have no matching campaigns).
+        """
+        project_ids = [str(pid) for pid in project_ids]
+        min_cached_at = int(time.time()) - max_age_seconds
+        cached: Dict[str, List[Dict[str, Any]]] = {}
+        with self._connect() as conn:
+            for i in range(0, len(project_ids), _SQLITE_IN_CHUNK):
+                chunk = project_ids[i:i + _SQLITE_IN_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                for project_id, rows in conn.execute(
+                    f"SELECT project_id, rows FROM project_cache WHERE project_id IN ({placeholders}) AND cached_at >= ?",
+                    [*chunk, min_cached_at],
+                ):
+                    cached[project_id] = json.loads(rows)
+        return cached
+
+    def cache_projects(self, rows_by_project: Dict[str, List[Dict[str, Any]]]) -> None:
+        """Cache MySQL rows per project_id (an empty list caches a project with no matches)."""
+        now = int(time.time())
+        with self._connect() as conn:
+            conn.executemany(
+                """
+                INSERT INTO project_cache (project_id, rows, cached_at) VALUES (?, ?, ?)
+                ON CONFLICT (project_id) DO UPDATE SET rows = excluded.rows, cached_at = excluded.cached_at
+                """,
+                [(str(pid), json.dumps(rows, default=str), now) for pid, rows in rows_by_project.items()],
+            )
+
+    def invalidate_projects(self, project_ids: Optional[Iterable[str]] = None) -> int:
+        """Drop cached rows for the given project_ids (all projects if None). Returns rows deleted."""
+        with self._connect() as conn:
+            if project_ids is None:
+                return conn.execute("DELETE FROM project_cache").rowcount
+            return conn.executemany(
+                "DELETE FROM project_cache WHERE project_id = ?", [(str(pid),) for pid in project_ids]
+            ).rowcount
+
+    # ---- recurrence history (campaign|trigger -> last seen) ----
+
+    def get_history(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Return {key: {"last_seen", "day_counts", "last_day"}} for the keys that have been seen.
+        day_counts/last_day hold the serialized recurrence.DayRing (None for entries without counters).
+        """
+        keys = list(dict.fromkeys(keys))
+        history: Dict[str, Dict[str, Any]] = {}
+        with self._connect() as conn:
+            for i in range(0, len(keys), _SQLITE_IN_CHUNK):
+                chunk = keys[i:i + _SQLITE_IN_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                for key, last_seen, day_counts, last_day in conn.execute(
+                    f"SELECT history_key, last_seen, day_counts, last_day FROM alert_history WHERE history_key IN ({placeholders})",
+                    chunk,
+                ):
+                    history[key] = {"last_seen": last_seen, "day_counts": day_counts, "last_day": last_day}
+        return history
+
+    def record_history(self, entries: Dict[str, Dict[str, Any]], keep_newer: bool = False) -> int:
+        """
+        Upsert {key: {"last_seen", "day_counts"?, "last_day"?}} in one transaction. With keep_newer, an
+        existing later entry is kept (used when importing old history). Returns rows written.
+        """
+        rows = [
+            (
+                key,
+                entry["last_seen"],
+                int(datetime.fromisoformat(entry["last_seen"]).timestamp()),
+                entry.get("day_counts"),
+                entry.get("last_day"),
+            )
+            for key, entry in entries.items()
+        ]
+        if not rows:
+            return 0
+        condition = " WHERE excluded.last_seen_ts > alert_history.last_seen_ts" if keep_newer else ""
+        with self._connect() as conn:
+            conn.executemany(
+                f"""
+                INSERT INTO alert_history (history_key, last_seen, last_seen_ts, day_counts, last_day) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (history_key) DO UPDATE SET
+                    last_seen = excluded.last_seen,
+                    last_seen_ts = excluded.last_seen_ts,
+                    day_counts = COALESCE(excluded.day_counts, alert_history.day_counts),
+                    last_day = COALESCE(excluded.last_day, alert_history.last_day){condition}
+                """,
+                rows,
+            )
+        return len(rows)
+
+    def count_recurrence(
+        self, events: Dict[str, Dict[str, int]], seen_at: str, window: int, today: int
+    ) -> Tuple[Dict[str, str], Dict[str, DayRing]]:
+        """
+        Count alert events on their day rings: events is {history_key: {event_key: event_day}}.
+        Events already in counted_events (an earlier flow or run) or older than the window are skipped.
+        Reads, counts and writes back (last_seen = seen_at) in one BEGIN IMMEDIATE transaction, so
+        overlapping runs can't overwrite each other's counters.
+        Returns ({key: last_seen before this call}, {key: DayRing}) for the keys in events.
+        """
+        keys = list(events)
+        previous: Dict[str, str] = {}
+        rings: Dict[str, DayRing] = {}
+        oldest_day = today - window + 1
+        seen_ts = int(datetime.fromisoformat(seen_at).timestamp())
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM counted_events WHERE event_day < ?", (oldest_day,))
+            counted = set()
+            for i in range(0, len(keys), _SQLITE_IN_CHUNK):
+                chunk = keys[i:i + _SQLITE_IN_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                for key, last_seen, day_counts, last_day in conn.execute(
+                    f"SELECT history_key, last_seen, day_counts, last_day FROM alert_history WHERE history_key IN ({placeholders})",
+                    chunk,
+                ):
+                    previous[key] = last_seen
+                    rings[key] = DayRing(window, day_counts, last_day)
+                counted.update(
+                    conn.execute(
+                        f"SELECT history_key, event_key FROM counted_events WHERE history_key IN ({placeholders})", chunk
+                    )
+                )
+
+            new_events = []
+            for key, key_events in events.items():
+                ring = rings.setdefault(key, DayRing(window))
+                for event_key, event_day in key_events.items():
+                    if event_day < oldest_day or (key, event_key) in counted:
+                        continue
+                    ring.add(event_day)
+                    new_events.append((key, event_key, event_day))
+            conn.executemany(
+                "INSERT INTO counted_events (history_key, event_key, event_day) VALUES (?, ?, ?)", new_events
+            )
+            conn.executemany(
+                """
+                INSERT INTO alert_history (history_key, last_seen, last_seen_ts, day_counts, last_day) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (history_key) DO UPDATE SET
+                    last_seen = excluded.last_seen,
+                    last_seen_ts = excluded.last_seen_ts,
+                    day_counts = excluded.day_counts,
+                    last_day = excluded.last_day
+                """,
+                [(key, seen_at, seen_ts, ring.to_bytes(), ring.last_day) for key, ring in rings.items()],
+            )
+        return previous, rings
+
+    def prune_history(self, before_ts: int) -> int:
+        """Delete history entries last seen before before_ts (uses the last_seen_ts index). Returns rows deleted."""
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM alert_history WHERE last_seen_ts < ?", (before_ts,)).rowcount
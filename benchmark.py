@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Benchmark the alert processing hot path on synthetic data.
+
+Times filtering (per-flow partition), matching (process_alerts_to_target_regions against
+in-memory MySQL/Vertica), grouping (group_alerts_for_report) and rendering
+(generate_alert_email_html) at several alert volumes. Data is generated from a fixed seed
+and caches are reset before every repeat, so results are comparable between runs.
+
+    python benchmark.py                          # 1k, 10k, 100k alerts
+    python benchmark.py --sizes 1000,1000000 --repeat 5
+    python benchmark.py --engines loop,columnar  # compare matchers (columnar needs NumPy)
+    python benchmark.py --sizes 1000000 --engines loop,sharded --shard-workers 8
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Add the current directory to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import main
+from alert_logging import flush_logs, set_log_level
+from columnar_match import columnar_available
+from config import TARGET_LOCATIONS
+from synthetic import dataset_fingerprint, generate_dataset, install_fake_databases, reset_caches
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+ENGINES = ("loop", "columnar", "sharded")
+DEFAULT_OUTPUT = "bench_output.txt"
+
+
+def _measure(fn: Callable[[], Any], repeat: int, reset: Callable[[], None]) -> Dict[str, Any]:
+    """Run fn `repeat` times (timed) plus once under tracemalloc; return latencies and peak memory."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        reset()
+        gc.collect()
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+
+    reset()
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"timings": timings, "peak_bytes": peak, "result": result}
+
+
+def _use_engine(engine: str, shard_workers: int) -> None:
+    main.COLUMNAR_MATCHING = engine == "columnar"
+    main.SHARD_WORKERS = shard_workers if engine == "sharded" else 0
+    main.SHARD_MIN_ALERTS = 0
+
+
+def run_benchmarks(
+    sizes: List[int],
+    repeat: int,
+    seed: int,
+    engines: Tuple[str, ...] = ("loop",),
+    shard_workers: int = 2,
+) -> List[Dict[str, Any]]:
+    """
+    Benchmark every stage at every size. Returns one result dict per (size, stage).
+    The match stage runs once per engine ("match" = loop, "match:columnar", "match:sharded") and
+    grouping once per loop/sharded engine; rendering uses the first engine's output.
+    """
+    results = []
+    for size in sizes:
+        alerts, rows_by_project, active_ids = generate_dataset(size, seed=seed)
+        install_fake_databases(main, rows_by_project, active_ids)
+        fingerprint = dataset_fingerprint(alerts)
+        matched: List[Dict[str, Any]] = []
+
+        def reset() -> None:
+            reset_caches(main)
+
+        def filter_stage() -> Any:
+            return main._partition_alerts_by_flow(alerts, main.ALERT_FLOWS)
+
+        def match_stage(engine: str) -> Callable[[], Any]:
+            def run() -> Any:
+                _use_engine(engine, shard_workers)
+                return main.process_alerts_to_target_regions(alerts, TARGET_LOCATIONS)
+
+            return run
+
+        def group_stage(engine: str) -> Callable[[], Any]:
+            def run() -> Any:
+                _use_engine(engine, shard_workers)
+                return [
+                    main._group_region_alerts([a for a in matched if a.get("region_type") == region])
+                    for region in ("LATAM", "Greater China")
+                ]
+
+            return run
+
+        def render_stage() -> Any:
+            _use_engine(engines[0], shard_workers)
+            return main.generate_alert_email_html(matched, TARGET_LOCATIONS, "/".join(sorted(TARGET_LOCATIONS)))
+
+        def stage_name(stage: str, engine: str) -> str:
+            return stage if engine == "loop" else f"{stage}:{engine}"
+
+        stages = [("filter", filter_stage, size)]
+        stages += [(stage_name("match", engine), match_stage(engine), size) for engine in engines]
+        stages += [(stage_name("group", engine), group_stage(engine), None) for engine in engines if engine != "columnar"]
+        stages += [("render", render_stage, None)]
+        grouped: Any = None
+        for stage, fn, items in stages:
+            measured = _measure(fn, repeat, reset)
+            if stage.startswith("match"):
+                if not matched:
+                    matched = measured["result"]
+                elif [dict(a) for a in measured["result"]] != [dict(a) for a in matched]:
+                    raise SystemExit(f"{stage} output differs from {stages[1][0]} at {size} alerts")
+            elif stage.startswith("group"):
+                if grouped is None:
+                    grouped = measured["result"]
+                elif measured["result"] != grouped:
+                    raise SystemExit(f"{stage} output differs from the first grouping at {size} alerts")
+            item_count = items if items is not None else len(matched)
+            median = statistics.median(measured["timings"])
+            results.append(
+                {
+                    "size": size,
+                    "stage": stage,
+                    "items": item_count,
+                    "median_seconds": median,
+                    "min_seconds": min(measured["timings"]),
+                    "max_seconds": max(measured["timings"]),
+                    "items_per_second": item_count / median if median > 0 else 0.0,
+                    "peak_mb": measured["peak_bytes"] / (1024 * 1024),
+                    "matched": len(matched),
+                    "dataset": fingerprint,
+                }
+            )
+    return results
+
+
+def format_results(results: List[Dict[str, Any]], repeat: int, seed: int) -> str:
+    """Fixed-width results table with the environment details needed to compare runs."""
+    lines = [
+        f"# benchmark {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')} UTC | "
+        f"python {platform.python_version()} | {platform.machine()} | seed {seed} | repeat {repeat}",
+        f"{'alerts':>9} {'stage':<14} {'items':>9} {'median s':>10} {'min s':>9} {'max s':>9} "
+        f"{'items/s':>12} {'peak MB':>9} {'dataset':>13}",
+    ]
+    for r in results:
+        lines.append(
+            f"{r['size']:>9} {r['stage']:<14} {r['items']:>9} {r['median_seconds']:>10.4f} {r['min_seconds']:>9.4f} "
+            f"{r['max_seconds']:>9.4f} {r['items_per_second']:>12,.0f} {r['peak_mb']:>9.1f} {r['dataset']:>13}"
+        )
+    return "\n".join(lines)
+
+
+def main_cli(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark alert filtering, matching, grouping and rendering")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES), help="Comma-separated alert counts")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repeats per stage (median is reported)")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic data seed")
+    parser.add_argument("--engines", default="loop", help=f"Comma-separated match engines to time ({', '.join(ENGINES)})")
+    parser.add_argument("--shard-workers", type=int, default=os.cpu_count() or 2, help="Processes for the sharded engine")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Append the results table to this file")
+    parser.add_argument("--json", help="Also append one JSON line per (size, stage) to this file")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s.replace("_", "")) for s in args.sizes.split(",") if s.strip()]
+    engines = tuple(e.strip() for e in args.engines.split(",") if e.strip())
+    unknown = [e for e in engines if e not in ENGINES]
+    if unknown or not engines:
+        parser.error(f"--engines must be from: {', '.join(ENGINES)}")
+    if "columnar" in engines and not columnar_available():
+        parser.error("the columnar engine needs NumPy (pip install numpy)")
+
+    # Keep the app's own logging out of the measurements
+    set_log_level("ERROR")
+    main.get_alert_store = lambda: None
+
+    results = run_benchmarks(sizes, max(args.repeat, 1), args.seed, engines, max(args.shard_workers, 2))
+    flush_logs()
+    table = format_results(results, args.repeat, args.seed)
+    print(table)
+
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.write(table + "\n\n")
+    if args.json:
+        with open(args.json, "a", encoding="utf-8") as f:
+            for r in results:
+                f.write(json.dumps({**r, "seed": args.seed, "repeat": args.repeat, "python": platform.python_version()}) + "\n")
+
+
+if __name__ == "__main__":
+    main_cli()
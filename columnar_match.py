@@ -0,0 +1,91 @@
+"""
+Columnar alert × campaign matching (optional, needs NumPy).
+Alerts and project rows become integer columns; the project join, the Vertica
+active-campaign test and the target-country bitmask filter then run as array
+operations. Output order and skip counters are the same as the row-by-row loop
+in process_alerts_to_target_regions.
+"""
+
+from typing import Any, Dict, List, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+from alert_records import AlertRecord
+from country_masks import locations_mask
+
+
+def columnar_available() -> bool:
+    return np is not None
+
+
+def match_alerts_columnar(
+    filtered_alerts: List[AlertRecord],
+    project_data: Dict[str, List[Dict[str, Any]]],
+    active_campaign_ids: Set[Any],
+    target_mask: int,
+) -> Tuple[List[AlertRecord], int, int, int]:
+    """
+    Join filtered alerts with their project rows and keep active, on-target campaigns.
+    Returns (matching alerts, skipped inactive, skipped off-target, alerts without project data).
+    """
+    # Project rows as flat columns, grouped by project: rows of project p are row_start[p]:row_start[p]+row_count[p]
+    project_index: Dict[str, int] = {}
+    rows: List[Dict[str, Any]] = []
+    row_count = []
+    for project_id, project_rows in project_data.items():
+        project_index[project_id] = len(row_count)
+        row_count.append(len(project_rows))
+        rows.extend(project_rows)
+    row_count = np.array(row_count + [0], dtype=np.int64)  # trailing 0 = "no project data"
+    row_start = np.concatenate(([0], np.cumsum(row_count)[:-1]))
+
+    # Campaign ids interned to ints so the Vertica membership test is an integer isin
+    campaign_codes: Dict[Any, int] = {}
+    row_campaign = np.fromiter(
+        (campaign_codes.setdefault(row["campaign_id"], len(campaign_codes)) for row in rows),
+        dtype=np.int64,
+        count=len(rows),
+    )
+    active_codes = np.fromiter(
+        (campaign_codes[cid] for cid in active_campaign_ids if cid in campaign_codes), dtype=np.int64
+    )
+    row_active = np.isin(row_campaign, active_codes)
+
+    # Empty `locations` means "no targeting restriction"; otherwise AND with the flow's mask
+    unrestricted = np.fromiter((not row["locations"] for row in rows), dtype=bool, count=len(rows))
+    masks = [locations_mask(row["locations"]) if row["locations"] else 0 for row in rows]
+    if target_mask.bit_length() <= 63 and all(mask.bit_length() <= 63 for mask in masks):
+        row_masks = np.array(masks, dtype=np.int64)
+        row_on_target = unrestricted | (np.bitwise_and(row_masks, np.int64(target_mask)) != 0)
+    else:  # more than 63 interned country codes: masks don't fit a machine word
+        row_on_target = unrestricted | np.fromiter(
+            (bool(mask & target_mask) for mask in masks), dtype=bool, count=len(rows)
+        )
+
+    # Alert column: index into the project columns (missing projects point at the trailing empty slot)
+    missing_slot = len(project_index)
+    alert_project = np.fromiter(
+        (project_index.get(alert.project_id, missing_slot) for alert in filtered_alerts),
+        dtype=np.int64,
+        count=len(filtered_alerts),
+    )
+
+    # Expand to one entry per alert × project row, in alert order then row order
+    pair_counts = row_count[alert_project]
+    pair_alert = np.repeat(np.arange(len(filtered_alerts), dtype=np.int64), pair_counts)
+    pair_offset = np.arange(pair_alert.size, dtype=np.int64) - np.repeat(np.cumsum(pair_counts) - pair_counts, pair_counts)
+    pair_row = np.repeat(row_start[alert_project], pair_counts) + pair_offset
+
+    pair_active = row_active[pair_row]
+    keep = pair_active & row_on_target[pair_row]
+
+    matching_alerts = [
+        filtered_alerts[a].with_row(rows[r]) for a, r in zip(pair_alert[keep].tolist(), pair_row[keep].tolist())
+    ]
+    skipped_inactive = int(pair_active.size - np.count_nonzero(pair_active))
+    skipped_off_target = int(np.count_nonzero(pair_active) - np.count_nonzero(keep))
+    missing_project_data = int(np.count_nonzero(alert_project == missing_slot))
+    return matching_alerts, skipped_inactive, skipped_off_target, missing_project_data
@@ -55,3 +55,74 @@ EMAIL_SETTINGS = {
 # Alert constants
 ALERT_CHECK_HOURS = 24
 ALERT_TYPE = "LP_CHANGE"
+
+# GeoEdge fetch constants
+GEOEDGE_TRIGGER_TYPES = {
+    "25": "LP Change",
+    "35": "Creative Change",
+    "32": "Auto Redirect",  # Correct auto redirect trigger ID (was 14, now 32)
+}
+GEOEDGE_FETCH_WORKERS = 3  # Max concurrent GeoEdge requests (trigger types × shards, 1 = sequential)
+GEOEDGE_REQUEST_TIMEOUT = 60  # Seconds per request
+GEOEDGE_SHARD_HOURS = 0  # Split each trigger's fetch window into shards of this many hours (0 = no sharding)
+GEOEDGE_BACKFILL_SHARD_HOURS = 6  # Shard size used by --since/--until backfills
+INCREMENTAL_FETCH = True  # Only request the delta since each trigger/location watermark
+WATERMARK_OVERLAP_SECONDS = 300  # Re-request this much before a watermark to catch late events
+ALERT_STORE_RETENTION_DAYS = 7  # Raw/enriched alerts kept in the local alert store (backfilled raw alerts are kept)
+GEOEDGE_STREAM_CHUNK_BYTES = 64 * 1024  # Read size for streaming alerts/history responses
+# Alert fields kept from full_raw GeoEdge payloads; everything else is dropped while parsing
+GEOEDGE_ALERT_FIELDS = (
+    "alert_id",
+    "history_id",
+    "trigger_type_id",
+    "alert_name",
+    "event_datetime",
+    "location",
+    "project_name",
+    "alert_details_url",
+)
+
+# GeoEdge response cache (on disk)
+GEOEDGE_CACHE_DIR = ".cache/geoedge"
+GEOEDGE_CACHE_TTL_SECONDS = 3600  # 0 disables the response cache
+GEOEDGE_CACHE_MAX_BYTES = 200 * 1024 * 1024  # LRU-evict beyond this total size
+GEOEDGE_CACHE_BUCKET_SECONDS = 900  # `to` is bucketed to this granularity in cache keys
+
+# MySQL project→campaign/publisher enrichment
+PROJECT_CACHE_TTL_SECONDS = 6 * 3600  # Cached project rows older than this are re-queried (0 disables)
+MYSQL_IN_CHUNK_SIZE = 1000  # Max project_ids per enrichment query
+MYSQL_QUERY_WORKERS = 4  # Parallel enrichment queries (each on its own connection)
+
+# Database connection pools (shared by all flows in a run)
+VERTICA_POOL_SIZE = 2
+DB_POOL_IDLE_TIMEOUT_SECONDS = 300  # Close pooled connections idle longer than this
+DB_POOL_HEALTHCHECK_AFTER_SECONDS = 30  # Ping pooled connections idle longer than this before reuse
+DB_POOL_WARMUP_JOIN_SECONDS = 35  # Max wait for the pipelined pool warmup before the pools close (Vertica connect timeout is 30s)
+
+# Vertica active-campaign check
+CAMPAIGN_STATUS_CACHE_TTL_SECONDS = 600  # Campaign status lookups are reused across flows for this long
+VERTICA_IN_CHUNK_SIZE = 500  # Campaign IDs bound per prepared status query (short chunks are padded)
+
+# Flow execution
+FLOW_WORKERS = 2  # Alert flows run concurrently on this many threads (1 = one after another)
+PIPELINED_STAGES = True  # Overlap DB connects with alert filtering and Vertica checks with the MySQL stream
+MYSQL_STREAM_BATCH_ROWS = 500  # Rows read per fetchmany from the server-side enrichment cursor
+
+# Country matching
+LOCATIONS_MASK_CACHE_SIZE = 8192  # Distinct campaign `locations` strings kept parsed as country bitmasks
+COLUMNAR_MATCHING = False  # Match alerts × campaign rows with NumPy array ops (falls back to the loop without NumPy)
+SHARD_WORKERS = 0  # Processes for matching/grouping on very large alert days (0 or 1 = in-process)
+SHARD_MIN_ALERTS = 50_000  # ...used only once a flow has at least this many filtered alerts
+STREAMING_PIPELINE = False  # Filter → enrich → tag → group each flow's alerts in chunks read lazily (from the alert store when incremental)
+STREAM_MEMORY_BUDGET_MB = 64  # Streaming working set: half of it sizes the in-flight alert chunks
+STREAM_ALERT_BYTES = 4096  # Estimated memory per in-flight alert (raw alert, record and matches) for chunk sizing
+STREAM_HTML_MAX_ROWS = 2000  # Rows per region table in a streamed email body (the attached CSV has all rows)
+
+# Recurrence
+RECURRENCE_WINDOW_DAYS = 30  # Day buckets kept per campaign|trigger for the Frequency / Streak columns
+
+# Logging
+LOG_LEVEL = "INFO"  # DEBUG adds per-alert match/skip lines; INFO logs per-flow counters only
+LOG_MAX_BYTES = 10 * 1024 * 1024  # Rotate alert_checker.log into a gzip archive past this size (0 = never)
+LOG_MAX_AGE_HOURS = 24 * 7  # ...or once its oldest line is this old (0 = never)
+LOG_BACKUP_COUNT = 8  # Rotated archives kept (alert_checker.log.<start>.gz)
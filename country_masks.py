@@ -0,0 +1,77 @@
+"""
+Country-code sets as integer bitmasks.
+Every ISO country code is interned to one bit the first time it is seen (config regions
+first, so they get the low bits). Each distinct campaign `locations` string is parsed
+once into a mask, so target intersection and focus filtering are a single integer AND.
+"""
+
+import os
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+from config import (
+    TARGET_LOCATIONS,
+    TARGET_LOCATIONS_ESIT,
+    PUBLISHER_REGIONS,
+    COUNTRY_DISPLAY,
+    LOCATIONS_MASK_CACHE_SIZE,
+)
+
+_CODE_BITS: Dict[str, int] = {}
+_BIT_CODES: List[str] = []
+_INTERN_LOCK = threading.Lock()
+
+
+def country_bit(code: str) -> int:
+    """Bit for a country code, assigning the next free bit to codes not seen before."""
+    bit = _CODE_BITS.get(code)
+    if bit is None:
+        with _INTERN_LOCK:
+            bit = _CODE_BITS.get(code)
+            if bit is None:
+                bit = 1 << len(_BIT_CODES)
+                _BIT_CODES.append(code)
+                _CODE_BITS[code] = bit
+    return bit
+
+
+def country_mask(codes: Iterable[str]) -> int:
+    """Mask for a set of country codes."""
+    mask = 0
+    for code in codes:
+        mask |= country_bit(code)
+    return mask
+
+
+def _reset_intern_lock() -> None:
+    # A forked shard worker may inherit the lock held by another thread of the parent
+    global _INTERN_LOCK
+    _INTERN_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_intern_lock)
+
+
+@lru_cache(maxsize=LOCATIONS_MASK_CACHE_SIZE)
+def locations_mask(locations: str) -> int:
+    """Mask for a campaign `locations` string ("US,CA,GB" or "US, CA, GB")."""
+    return country_mask(loc.strip() for loc in locations.split(","))
+
+
+@lru_cache(maxsize=LOCATIONS_MASK_CACHE_SIZE)
+def mask_codes(mask: int) -> Tuple[str, ...]:
+    """Country codes in a mask, sorted."""
+    codes = []
+    index = 0
+    while mask:
+        if mask & 1:
+            codes.append(_BIT_CODES[index])
+        mask >>= 1
+        index += 1
+    return tuple(sorted(codes))
+
+
+for _code in sorted(TARGET_LOCATIONS | TARGET_LOCATIONS_ESIT | PUBLISHER_REGIONS | set(COUNTRY_DISPLAY)):
+    country_bit(_code)
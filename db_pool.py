@@ -0,0 +1,146 @@
+"""
+Small thread-safe connection pool shared by the MySQL and Vertica stages.
+Connections are reused across flows within a process, health-checked after
+sitting idle and closed once they exceed the idle timeout.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class ConnectionPool:
+    """
+    Pool of up to max_size DB-API connections created by `connect`.
+    `health_check(conn)` must raise if the connection is unusable; it runs on
+    checkout for connections idle longer than health_check_after seconds.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        connect: Callable[[], Any],
+        max_size: int = 4,
+        idle_timeout: float = 300,
+        health_check: Optional[Callable[[Any], None]] = None,
+        health_check_after: float = 30,
+    ):
+        self.name = name
+        self._connect = connect
+        self.max_size = max(max_size, 1)
+        self.idle_timeout = idle_timeout
+        self._health_check = health_check
+        self.health_check_after = health_check_after
+        self._idle: List[Tuple[Any, float]] = []  # (connection, released_at), most recent last
+        self._size = 0
+        self._cond = threading.Condition()
+        self._stats: Dict[str, float] = {
+            "connects": 0,
+            "connect_seconds": 0.0,
+            "max_connect_seconds": 0.0,
+            "reuses": 0,
+            "health_check_failures": 0,
+            "idle_expired": 0,
+            "discarded": 0,
+        }
+
+    def _close(self, conn: Any) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        """Check out a connection, reusing an idle one when possible."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            candidate = None
+            with self._cond:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"{self.name} pool exhausted ({self.max_size} connections in use)")
+                    self._cond.wait(remaining)
+
+                if self._idle:
+                    candidate, released_at = self._idle.pop()
+                else:
+                    self._size += 1  # reserve a slot; connect outside the lock
+
+            if candidate is None:
+                return self._open()
+
+            idle_for = time.monotonic() - released_at
+            if idle_for > self.idle_timeout:
+                self._drop(candidate, "idle_expired")
+                continue
+            if self._health_check is not None and idle_for > self.health_check_after:
+                try:
+                    self._health_check(candidate)
+                except Exception:
+                    self._drop(candidate, "health_check_failures")
+                    continue
+
+            with self._cond:
+                self._stats["reuses"] += 1
+            return candidate
+
+    def _open(self) -> Any:
+        started = time.perf_counter()
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        elapsed = time.perf_counter() - started
+        with self._cond:
+            self._stats["connects"] += 1
+            self._stats["connect_seconds"] += elapsed
+            self._stats["max_connect_seconds"] = max(self._stats["max_connect_seconds"], elapsed)
+        return conn
+
+    def _drop(self, conn: Any, reason: str) -> None:
+        self._close(conn)
+        with self._cond:
+            self._size -= 1
+            self._stats[reason] += 1
+            self._cond.notify()
+
+    def release(self, conn: Any, discard: bool = False) -> None:
+        """Return a connection to the pool (or close it if discard)."""
+        if discard:
+            self._drop(conn, "discarded")
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Borrow a connection; it is discarded instead of reused if the block raises."""
+        conn = self.acquire()
+        try:
+            yield conn
+        except BaseException:
+            self.release(conn, discard=True)
+            raise
+        self.release(conn)
+
+    def close_all(self) -> None:
+        """Close idle connections. Connections currently checked out are closed when released with discard."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+        for conn, _ in idle:
+            self._close(conn)
+
+    def stats(self) -> Dict[str, float]:
+        """Connect-time and reuse counters, plus current pool occupancy."""
+        with self._cond:
+            stats = dict(self._stats)
+            stats["open"] = self._size
+            stats["idle"] = len(self._idle)
+        return stats
@@ -0,0 +1,190 @@
+"""
+Local stand-ins for the GeoEdge alerts/history API and the SMTP relay.
+Both run on 127.0.0.1 in background threads; point GEOEDGE_API_BASE and
+SMTP_SERVER/SMTP_PORT at them (see load_test.py).
+"""
+
+import json
+import random
+import socketserver
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from synthetic import generate_alerts
+
+
+class FakeGeoEdgeServer:
+    """
+    Serves GET /alerts/history with synthetic alerts for the requested trigger, locations and time window.
+    Responses are deterministic per request (seeded by the query), delayed by latency_ms ± jitter_ms,
+    and error_rate of them fail with HTTP 500.
+    """
+
+    def __init__(
+        self,
+        alerts_per_request: int = 1000,
+        project_count: int = 2000,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.alerts_per_request = alerts_per_request
+        self.project_count = project_count
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.seed = seed
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0, "alerts": 0, "bytes": 0}
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeGeoEdgeServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-geoedge", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _count(self, **amounts: int) -> None:
+        with self._lock:
+            for name, amount in amounts.items():
+                self.stats[name] += amount
+
+    def build_response(self, query: Dict[str, str]) -> Optional[bytes]:
+        """Response body for a query, or None if this request should fail."""
+        request_seed = zlib.crc32(json.dumps(sorted(query.items())).encode("utf-8")) ^ self.seed
+        rng = random.Random(request_seed)
+
+        delay = self.latency_ms + (rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+        if rng.random() < self.error_rate:
+            return None
+
+        trigger_id = query.get("trigger_type_id", "25")
+        locations = [code.strip() for code in query.get("location_id", "US").split(",") if code.strip()]
+        from_ts = int(query.get("from", 0))
+        to_ts = max(int(query.get("to", from_ts + 1)), from_ts + 1)
+
+        alerts: List[Dict[str, Any]] = generate_alerts(
+            self.alerts_per_request, seed=request_seed, project_count=self.project_count
+        )
+        for alert in alerts:
+            code = rng.choice(locations)
+            alert["trigger_type_id"] = trigger_id
+            alert["location"] = {code: code}
+            alert["event_datetime"] = datetime.fromtimestamp(rng.randrange(from_ts, to_ts), timezone.utc).strftime(
+                "%Y-%m-%d %H:%M:%S"
+            )
+            del alert["trigger_type_name"]  # added client-side by fetch_alerts_from_geoedge
+        return json.dumps({"status": {"code": "Success"}, "response": {"alerts": alerts}}).encode("utf-8")
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                parsed = urlparse(self.path)
+                if not parsed.path.rstrip("/").endswith("/alerts/history"):
+                    self.send_error(404)
+                    return
+                query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+                body = server.build_response(query)
+                if body is None:
+                    server._count(requests=1, errors=1)
+                    self.send_error(500, "Injected error")
+                    return
+                server._count(requests=1, alerts=server.alerts_per_request, bytes=len(body))
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass  # keep the harness output clean
+
+        return Handler
+
+
+class SMTPSink:
+    """Minimal SMTP server that accepts every message and counts it (no TLS, no auth)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats = {"messages": 0, "recipients": 0, "bytes": 0}
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def start(self) -> "SMTPSink":
+        threading.Thread(target=self._server.serve_forever, name="smtp-sink", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _record(self, recipients: int, size: int) -> None:
+        with self._lock:
+            self.stats["messages"] += 1
+            self.stats["recipients"] += recipients
+            self.stats["bytes"] += size
+
+    def _handler_class(self):
+        sink = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line: str) -> None:
+                self.wfile.write(f"{line}\r\n".encode("ascii"))
+
+            def handle(self) -> None:
+                self.reply("220 localhost SMTP sink")
+                recipients = 0
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    command = line.decode("utf-8", "replace").strip().upper()
+                    if command.startswith(("EHLO", "HELO")):
+                        self.reply("250 localhost")
+                    elif command.startswith("MAIL FROM"):
+                        recipients = 0
+                        self.reply("250 OK")
+                    elif command.startswith("RCPT TO"):
+                        recipients += 1
+                        self.reply("250 OK")
+                    elif command == "DATA":
+                        self.reply("354 End data with <CR><LF>.<CR><LF>")
+                        size = 0
+                        for data_line in iter(self.rfile.readline, b""):
+                            if data_line in (b".\r\n", b".\n"):
+                                break
+                            size += len(data_line)
+                        sink._record(recipients, size)
+                        self.reply("250 OK")
+                    elif command == "QUIT":
+                        self.reply("221 Bye")
+                        return
+                    else:  # RSET, NOOP, ...
+                        self.reply("250 OK")
+
+        return Handler
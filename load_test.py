@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test of main() with no network: a local fake GeoEdge API, a local SMTP
+sink and in-memory MySQL/Vertica. Runs main() `--runs` times, `--concurrency` at a time,
+in a throwaway working directory, and reports throughput and latency percentiles.
+Each run is its own Python process (as with the scheduler), so connection pools, run ids and
+in-process caches are never shared between runs; the working directory (alert store, response
+cache, logs) is.
+
+    python load_test.py --runs 20 --concurrency 4 --alerts-per-request 2000 --latency-ms 50 --error-rate 0.02
+"""
+
+import argparse
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+# Add the current directory to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_services import FakeGeoEdgeServer, SMTPSink
+from synthetic import generate_project_rows, pick_active_campaigns, install_fake_databases
+
+DEFAULT_OUTPUT = "bench_output.txt"
+_ELAPSED_PREFIX = "LOAD_TEST_ELAPSED "
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+def run_load_test(
+    runs: int,
+    concurrency: int,
+    alerts_per_request: int,
+    project_count: int,
+    latency_ms: float,
+    jitter_ms: float,
+    error_rate: float,
+    warm_caches: bool,
+    seed: int,
+    streaming: bool = False,
+) -> Dict[str, float]:
+    """Start the stand-ins, run main() under load and return summary stats."""
+    geoedge = FakeGeoEdgeServer(alerts_per_request, project_count, latency_ms, jitter_ms, error_rate, seed).start()
+    smtp = SMTPSink().start()
+
+    # Inherited by every run process; main's load_dotenv doesn't override it
+    os.environ.update(
+        {
+            "GEOEDGE_API_KEY": "load-test",
+            "GEOEDGE_API_BASE": geoedge.base_url,
+            "SMTP_SERVER": "127.0.0.1",
+            "SMTP_PORT": str(smtp.port),
+            "SMTP_USER": "",
+            "SMTP_PASSWORD": "",
+            "RECIPIENTS_PRIMARY": "primary@example.com",
+            "RECIPIENTS_ESIT": "esit@example.com",
+            "RECIPIENTS": "fallback@example.com",
+            "CC_RECIPIENTS_PRIMARY": "",
+            "CC_RECIPIENTS_ESIT": "",
+        }
+    )
+
+    def timed_run(_: int) -> float:
+        command = [sys.executable, os.path.abspath(__file__), "--run-once", "--projects", str(project_count), "--seed", str(seed)]
+        command += ["--warm"] if warm_caches else []
+        command += ["--streaming"] if streaming else []
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise RuntimeError(f"main() run failed (exit {completed.returncode}):\n{completed.stderr[-2000:]}")
+        for line in reversed(completed.stdout.splitlines()):
+            if line.startswith(_ELAPSED_PREFIX):
+                return float(line[len(_ELAPSED_PREFIX):])
+        raise RuntimeError("main() run did not report its duration")
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as executor:
+            latencies = list(executor.map(timed_run, range(runs)))
+    finally:
+        geoedge.stop()
+        smtp.stop()
+    wall = time.perf_counter() - started
+
+    return {
+        "runs": runs,
+        "concurrency": concurrency,
+        "wall_seconds": wall,
+        "runs_per_second": runs / wall if wall else 0.0,
+        "alerts_per_second": geoedge.stats["alerts"] / wall if wall else 0.0,
+        "p50": _percentile(latencies, 50),
+        "p95": _percentile(latencies, 95),
+        "p99": _percentile(latencies, 99),
+        "max": max(latencies) if latencies else 0.0,
+        "http_requests": geoedge.stats["requests"],
+        "http_errors": geoedge.stats["errors"],
+        "http_mb": geoedge.stats["bytes"] / (1024 * 1024),
+        "emails": smtp.stats["messages"],
+    }
+
+
+def run_once(project_count: int, warm_caches: bool, seed: int, streaming: bool) -> None:
+    """One main() run in this process against the stand-ins named in the environment; prints its duration."""
+    import main
+    from alert_logging import flush_logs, set_log_level
+
+    rows_by_project = generate_project_rows([f"{i:06d}" for i in range(project_count)], seed=seed)
+    install_fake_databases(main, rows_by_project, pick_active_campaigns(rows_by_project, seed=seed))
+    if not warm_caches:
+        # Every run does the full fetch → MySQL → Vertica path
+        main.INCREMENTAL_FETCH = False
+        main.get_response_cache = lambda: None
+        main.PROJECT_CACHE_TTL_SECONDS = 0
+        main.CAMPAIGN_STATUS_CACHE_TTL_SECONDS = 0
+    main.STREAMING_PIPELINE = streaming
+    set_log_level("WARNING")
+
+    started = time.perf_counter()
+    main.main([])
+    elapsed = time.perf_counter() - started
+    flush_logs()
+    print(f"{_ELAPSED_PREFIX}{elapsed:.6f}", flush=True)
+
+
+def format_summary(stats: Dict[str, float], args: argparse.Namespace) -> str:
+    return "\n".join(
+        [
+            f"# load test {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')} UTC | runs {stats['runs']} | "
+            f"concurrency {stats['concurrency']} | {args.alerts_per_request} alerts/request | "
+            f"latency {args.latency_ms}±{args.jitter_ms} ms | error rate {args.error_rate} | "
+            f"{'warm' if args.warm else 'cold'} caches{' | streaming' if args.streaming else ''} | seed {args.seed}",
+            f"throughput: {stats['runs_per_second']:.2f} runs/s, {stats['alerts_per_second']:,.0f} alerts/s "
+            f"({stats['wall_seconds']:.2f}s wall)",
+            f"run latency: p50 {stats['p50']:.2f}s, p95 {stats['p95']:.2f}s, p99 {stats['p99']:.2f}s, max {stats['max']:.2f}s",
+            f"GeoEdge: {stats['http_requests']} requests ({stats['http_errors']} injected errors, {stats['http_mb']:.1f} MB) | "
+            f"SMTP: {stats['emails']} emails received",
+        ]
+    )
+
+
+def main_cli(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Load-test main() against local GeoEdge/SMTP/DB stand-ins")
+    parser.add_argument("--runs", type=int, default=10, help="Total main() runs")
+    parser.add_argument("--concurrency", type=int, default=2, help="main() runs in flight at once")
+    parser.add_argument("--alerts-per-request", type=int, default=1000, help="Alerts in each fake GeoEdge response")
+    parser.add_argument("--projects", type=int, default=2000, help="Distinct project ids across alerts")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Fake GeoEdge response latency")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="± random jitter added to the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of GeoEdge requests answered with HTTP 500")
+    parser.add_argument("--warm", action="store_true", help="Keep incremental fetch and the caches on (only the on-disk ones carry over between runs)")
+    parser.add_argument("--streaming", action="store_true", help="Run flows through the chunked streaming pipeline")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic data seed")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Append the summary to this file")
+    parser.add_argument("--run-once", action="store_true", help=argparse.SUPPRESS)  # child process of a load test
+    args = parser.parse_args(argv)
+
+    if args.run_once:
+        run_once(args.projects, args.warm, args.seed, args.streaming)
+        return
+
+    output = os.path.abspath(args.output) if args.output else None
+    original_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="lp-alerts-load-") as workdir:
+        # Alert store, history, caches and logs all go to the throwaway directory
+        os.chdir(workdir)
+        try:
+            stats = run_load_test(
+                args.runs,
+                args.concurrency,
+                args.alerts_per_request,
+                args.projects,
+                args.latency_ms,
+                args.jitter_ms,
+                args.error_rate,
+                args.warm,
+                args.seed,
+                args.streaming,
+            )
+        finally:
+            os.chdir(original_cwd)
+
+    summary = format_summary(stats, args)
+    print(summary)
+    if output:
+        with open(output, "a", encoding="utf-8") as f:
+            f.write(summary + "\n\n")
+
+
+if __name__ == "__main__":
+    main_cli()
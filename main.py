@@ -6,13 +6,20 @@ Database queries and email alerts for LP changes
 
 import os
 import sys
+import argparse
 import csv
 import io
+import itertools
 import json
+import codecs
 import smtplib
+import threading
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator, Callable, TextIO
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.application import MIMEApplication
@@ -29,11 +36,74 @@ from config import (
     GREATER_CHINA_COUNTRIES,
     ALERT_CHECK_HOURS,
     EMAIL_SETTINGS,
+    GEOEDGE_TRIGGER_TYPES,
+    GEOEDGE_FETCH_WORKERS,
+    GEOEDGE_REQUEST_TIMEOUT,
+    GEOEDGE_STREAM_CHUNK_BYTES,
+    GEOEDGE_ALERT_FIELDS,
+    GEOEDGE_SHARD_HOURS,
+    GEOEDGE_BACKFILL_SHARD_HOURS,
+    GEOEDGE_CACHE_DIR,
+    GEOEDGE_CACHE_TTL_SECONDS,
+    GEOEDGE_CACHE_MAX_BYTES,
+    GEOEDGE_CACHE_BUCKET_SECONDS,
+    INCREMENTAL_FETCH,
+    WATERMARK_OVERLAP_SECONDS,
+    ALERT_STORE_RETENTION_DAYS,
+    PROJECT_CACHE_TTL_SECONDS,
+    MYSQL_IN_CHUNK_SIZE,
+    MYSQL_QUERY_WORKERS,
+    VERTICA_POOL_SIZE,
+    DB_POOL_IDLE_TIMEOUT_SECONDS,
+    DB_POOL_HEALTHCHECK_AFTER_SECONDS,
+    DB_POOL_WARMUP_JOIN_SECONDS,
+    CAMPAIGN_STATUS_CACHE_TTL_SECONDS,
+    VERTICA_IN_CHUNK_SIZE,
+    FLOW_WORKERS,
+    RECURRENCE_WINDOW_DAYS,
+    LOG_LEVEL,
+    LOG_MAX_BYTES,
+    LOG_MAX_AGE_HOURS,
+    LOG_BACKUP_COUNT,
+    PIPELINED_STAGES,
+    MYSQL_STREAM_BATCH_ROWS,
+    COLUMNAR_MATCHING,
+    SHARD_WORKERS,
+    SHARD_MIN_ALERTS,
+    STREAMING_PIPELINE,
+    STREAM_MEMORY_BUDGET_MB,
+    STREAM_ALERT_BYTES,
+    STREAM_HTML_MAX_ROWS,
 )
+from alert_logging import (
+    DEBUG,
+    WARNING,
+    ERROR,
+    LOG_LEVELS,
+    log_enabled,
+    log_message,
+    buffered_flow_log,
+    bind_flow_log,
+    flush_logs,
+    set_log_level,
+    set_log_rotation,
+    start_run_log,
+    end_run_log,
+)
+from alert_records import AlertRecord
+from alert_store import AlertStore
+from columnar_match import columnar_available, match_alerts_columnar
+from country_masks import country_mask, locations_mask, mask_codes
+from response_cache import ResponseCache
+from sharded_match import group_alerts_sharded, match_alerts_sharded
+from recurrence import DayRing, epoch_day
+from run_metrics import flow_metrics, bind_metrics, record_span, record_count, set_run_id
+from db_pool import ConnectionPool
 
 load_dotenv()
+set_log_level(LOG_LEVEL)
+set_log_rotation(LOG_MAX_BYTES, LOG_MAX_AGE_HOURS, LOG_BACKUP_COUNT)
 
-LOG_FILE = "alert_checker.log"
 ALERT_HISTORY_FILE = "alert_history.json"
 ALERT_HISTORY_DAYS = 7  # Mark campaigns as RECURRING if seen within this window
 
@@ -57,19 +127,49 @@ def save_alert_history(history: Dict[str, str]) -> None:
         with open(ALERT_HISTORY_FILE, "w", encoding="utf-8") as f:
             json.dump(pruned, f, indent=2)
     except Exception as e:
-        log_message(f"⚠️ Could not save alert history: {e}")
+        log_message(f"⚠️ Could not save alert history: {e}", WARNING)
+
+
+_ALERT_STORE: Optional[AlertStore] = None
+
+
+_ALERT_STORE_LOCK = threading.Lock()
+
 
+def get_alert_store() -> Optional[AlertStore]:
+    """Return the shared local alert store, or None if it can't be opened."""
+    global _ALERT_STORE
+    with _ALERT_STORE_LOCK:
+        if _ALERT_STORE is None:
+            try:
+                _ALERT_STORE = AlertStore()
+            except Exception as e:
+                log_message(f"⚠️ Could not open alert store ({e}) — running without local alert storage", WARNING)
+                return None
+        return _ALERT_STORE
 
-def log_message(message: str) -> None:
-    """Log message to file and console"""
-    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
-    log_entry = f"[{timestamp}] {message}"
-    print(log_entry)
+
+def _alert_event_key(alert: Dict[str, Any]) -> str:
+    """
+    Unique key for one alert event. alert_id identifies the GeoEdge alert definition
+    (shared by many events), so prefer history_id.
+    """
+    history_id = alert.get("history_id")
+    if history_id:
+        return str(history_id)
+    project_name = alert.get("project_name")
+    project_ids = alert.get("project_id") or (",".join(sorted(project_name)) if isinstance(project_name, dict) else "")
+    return f"{alert.get('alert_id')}|{alert.get('trigger_type_id')}|{project_ids}|{alert.get('event_datetime')}"
+
+
+def _parse_event_timestamp(value: Any) -> Optional[int]:
+    """Parse GeoEdge event_datetime ("YYYY-MM-DD HH:MM:SS", UTC) to a unix timestamp."""
+    if not value:
+        return None
     try:
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(log_entry + "\n")
-    except Exception:
-        pass
+        return int(datetime.strptime(str(value), "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc).timestamp())
+    except ValueError:
+        return None
 
 
 def _env_or_fail(key: str) -> str:
@@ -95,78 +195,509 @@ def get_database_connection():
         password=password,
         database=database,
         cursorclass=pymysql.cursors.DictCursor,
+        autocommit=True,  # pooled connections must not keep a stale read snapshot between queries
     )
 
 
+def get_vertica_connection():
+    """Create Vertica database connection"""
+    conn_info = {
+        "host": _env_or_fail("VERTICA_HOST"),
+        "port": int(os.getenv("VERTICA_PORT", "5433")),
+        "user": _env_or_fail("VERTICA_USER"),
+        "password": os.getenv("VERTICA_PASSWORD", ""),
+        "database": _env_or_fail("VERTICA_DB"),
+        "connection_timeout": 30,
+    }
+    return vertica_python.connect(**conn_info)
+
+
+def _mysql_health_check(connection) -> None:
+    connection.ping(reconnect=False)
+
+
+def _vertica_health_check(connection) -> None:
+    with connection.cursor() as cur:
+        cur.execute("SELECT 1")
+        cur.fetchall()
+
+
+_DB_POOLS: Dict[str, ConnectionPool] = {}
+_DB_POOLS_LOCK = threading.Lock()
+
+
+def _get_db_pool(name: str) -> ConnectionPool:
+    """Return the process-wide pool for "mysql" or "vertica", creating it on first use."""
+    with _DB_POOLS_LOCK:
+        if name not in _DB_POOLS:
+            if name == "mysql":
+                _DB_POOLS[name] = ConnectionPool(
+                    "MySQL",
+                    lambda: get_database_connection(),
+                    max_size=MYSQL_QUERY_WORKERS,
+                    idle_timeout=DB_POOL_IDLE_TIMEOUT_SECONDS,
+                    health_check=_mysql_health_check,
+                    health_check_after=DB_POOL_HEALTHCHECK_AFTER_SECONDS,
+                )
+            else:
+                _DB_POOLS[name] = ConnectionPool(
+                    "Vertica",
+                    lambda: get_vertica_connection(),
+                    max_size=VERTICA_POOL_SIZE,
+                    idle_timeout=DB_POOL_IDLE_TIMEOUT_SECONDS,
+                    health_check=_vertica_health_check,
+                    health_check_after=DB_POOL_HEALTHCHECK_AFTER_SECONDS,
+                )
+        return _DB_POOLS[name]
+
+
+def get_mysql_pool() -> ConnectionPool:
+    return _get_db_pool("mysql")
+
+
+def get_vertica_pool() -> ConnectionPool:
+    return _get_db_pool("vertica")
+
+
+def close_db_pools() -> None:
+    """Close pooled DB connections and log per-backend connect metrics."""
+    with _DB_POOLS_LOCK:
+        pools = list(_DB_POOLS.values())
+        _DB_POOLS.clear()
+    for pool in pools:
+        pool.close_all()
+        stats = pool.stats()
+        avg_ms = stats["connect_seconds"] / stats["connects"] * 1000 if stats["connects"] else 0.0
+        log_message(
+            f"🔌 {pool.name} pool: {stats['connects']:.0f} connects (avg {avg_ms:.0f} ms, "
+            f"max {stats['max_connect_seconds'] * 1000:.0f} ms), {stats['reuses']:.0f} reuses, "
+            f"{stats['health_check_failures']:.0f} failed health checks, {stats['idle_expired']:.0f} idle-expired"
+        )
+
+
+def warm_db_pools(pools: Optional[Dict[str, ConnectionPool]] = None) -> None:
+    """Open one MySQL and one Vertica connection ahead of first use; failures are left for the real queries to report."""
+    pools = pools or {name: _get_db_pool(name) for name in ("mysql", "vertica")}
+    for name, pool in pools.items():
+        try:
+            conn = pool.acquire()
+        except Exception as e:
+            log_message(f"⚠️ Could not pre-open {pool.name} connection: {e}", WARNING)
+            continue
+        with _DB_POOLS_LOCK:
+            closed = _DB_POOLS.get(name) is not pool
+        # close_db_pools() ran while we were connecting: don't park the connection in a dropped pool
+        pool.release(conn, discard=closed)
+
+
+def start_db_pool_warmup() -> Optional[threading.Thread]:
+    """In pipelined mode, warm the DB pools on a background thread; join it with join_db_pool_warmup()."""
+    if not PIPELINED_STAGES:
+        return None
+    # Resolve the pools here so a close_db_pools() racing the thread can't leave it a fresh, never-closed pool
+    pools = {name: _get_db_pool(name) for name in ("mysql", "vertica")}
+    thread = threading.Thread(target=warm_db_pools, args=(pools,), name="db-pool-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def join_db_pool_warmup(thread: Optional[threading.Thread]) -> None:
+    """Wait (up to DB_POOL_WARMUP_JOIN_SECONDS) for a warmup thread before the pools are closed."""
+    if thread is None:
+        return
+    thread.join(DB_POOL_WARMUP_JOIN_SECONDS)
+    if thread.is_alive():
+        log_message(f"⚠️ DB pool warmup still connecting after {DB_POOL_WARMUP_JOIN_SECONDS}s", WARNING)
+
+
+_CAMPAIGN_STATUS_CACHE: Dict[Any, Tuple[bool, float]] = {}  # campaign_id -> (is_active, checked_at)
+_CAMPAIGN_STATUS_LOCK = threading.Lock()
+
+
+def _active_campaigns_sql(placeholder_count: int) -> str:
+    """Status query with `?` bind placeholders (server-side prepared statement)."""
+    placeholders = ",".join(["?"] * placeholder_count)
+    return f"""
+        SELECT id
+        FROM trc.sp_campaigns_latest_snapshot
+        WHERE id IN ({placeholders})
+          AND status = 'APPROVED'
+          AND display_status = 'RUNNING'
+    """
+
+
+def _query_active_campaigns(campaign_ids: List[Any]) -> set:
+    """
+    Query Vertica for the APPROVED + RUNNING subset of campaign_ids in bound chunks of
+    VERTICA_IN_CHUNK_SIZE. Short chunks are padded so every execution reuses one prepared
+    statement. Raises on Vertica errors.
+    """
+    chunk_size = max(VERTICA_IN_CHUNK_SIZE, 1)
+    sql = _active_campaigns_sql(chunk_size)
+    active_ids = set()
+
+    with get_vertica_pool().connection() as conn:
+        with conn.cursor() as cur:
+            for i in range(0, len(campaign_ids), chunk_size):
+                chunk = campaign_ids[i:i + chunk_size]
+                padded = chunk + [chunk[-1]] * (chunk_size - len(chunk))
+                cur.execute(sql, padded, use_prepared_statements=True)
+                active_ids.update(row[0] for row in cur.fetchall())
+
+    return active_ids
+
+
 def filter_active_campaigns(campaign_ids: List[int]) -> set:
     """
     Query Vertica to return only campaign IDs that are currently APPROVED + RUNNING.
     Campaigns that are STOPPED, TERMINATED, REJECTED, SPEND_COMPLETED are excluded.
+    Statuses are cached in-process for CAMPAIGN_STATUS_CACHE_TTL_SECONDS so later flows
+    only query campaign IDs that haven't been checked recently.
     Returns a set of active campaign_ids.
     """
     if not campaign_ids:
         return set()
 
+    active_ids, cache_hits = _check_campaign_statuses(campaign_ids)
+    _log_campaign_statuses(set(campaign_ids), active_ids, cache_hits)
+    return active_ids
+
+
+def _check_campaign_statuses(campaign_ids: List[Any]) -> Tuple[set, int]:
+    """
+    Body of filter_active_campaigns without the summary lines (only failures are logged).
+    Returns (active campaign_ids, how many were served from the status cache).
+    """
+    now = time.monotonic()
+    cached: Dict[Any, bool] = {}
+    with _CAMPAIGN_STATUS_LOCK:
+        for cid in campaign_ids:
+            entry = _CAMPAIGN_STATUS_CACHE.get(cid)
+            if entry is not None and now - entry[1] <= CAMPAIGN_STATUS_CACHE_TTL_SECONDS:
+                cached[cid] = entry[0]
+    uncached_ids = [cid for cid in campaign_ids if cid not in cached]
+    cached_active_ids = {cid for cid, is_active in cached.items() if is_active}
+    record_count("campaign_status_cache_lookups", len(campaign_ids))
+    record_count("campaign_status_cache_hits", len(cached))
+
     try:
-        conn_info = {
-            "host": _env_or_fail("VERTICA_HOST"),
-            "port": int(os.getenv("VERTICA_PORT", "5433")),
-            "user": _env_or_fail("VERTICA_USER"),
-            "password": os.getenv("VERTICA_PASSWORD", ""),
-            "database": _env_or_fail("VERTICA_DB"),
-            "connection_timeout": 30,
-        }
+        with record_span("vertica"):
+            queried_active_ids = _query_active_campaigns(uncached_ids) if uncached_ids else set()
+    except Exception as e:
+        log_message(f"⚠️ Vertica status check failed ({e}) — including all uncached campaigns to avoid false negatives", WARNING)
+        # Fail open: don't drop campaigns if Vertica is unreachable
+        return cached_active_ids | set(uncached_ids), len(cached)
 
-        placeholders = ",".join(str(cid) for cid in campaign_ids)
-        sql = f"""
-            SELECT id
-            FROM trc.sp_campaigns_latest_snapshot
-            WHERE id IN ({placeholders})
-              AND status = 'APPROVED'
-              AND display_status = 'RUNNING'
-        """
+    with _CAMPAIGN_STATUS_LOCK:
+        for cid in uncached_ids:
+            _CAMPAIGN_STATUS_CACHE[cid] = (cid in queried_active_ids, now)
 
-        with vertica_python.connect(**conn_info) as conn:
-            with conn.cursor() as cur:
-                cur.execute(sql)
-                rows = cur.fetchall()
-                active_ids = {row[0] for row in rows}
+    return cached_active_ids | queried_active_ids, len(cached)
 
-        skipped = set(campaign_ids) - active_ids
-        if skipped:
-            log_message(f"🚫 Vertica status check: skipping {len(skipped)} non-active campaigns: {skipped}")
-        log_message(f"✅ Vertica status check: {len(active_ids)}/{len(campaign_ids)} campaigns are APPROVED+RUNNING")
-        return active_ids
+
+def _log_campaign_statuses(campaign_ids: set, active_ids: set, cache_hits: int) -> None:
+    """One cache / Vertica summary for a flow's campaign status check."""
+    log_message(
+        f"🗂️ Campaign status cache: {cache_hits}/{len(campaign_ids)} campaign IDs served from cache, "
+        f"{len(campaign_ids) - cache_hits} queried from Vertica"
+    )
+    skipped = campaign_ids - active_ids
+    if skipped:
+        log_message(f"🚫 Vertica status check: skipping {len(skipped)} non-active campaigns: {skipped}")
+    log_message(f"✅ Vertica status check: {len(active_ids)}/{len(campaign_ids)} campaigns are APPROVED+RUNNING")
+
+
+_HTTP_SESSION: Optional[requests.Session] = None
+_HTTP_SESSION_LOCK = threading.Lock()
+
+
+def _get_http_session() -> requests.Session:
+    """Return the shared keep-alive session used for GeoEdge requests."""
+    global _HTTP_SESSION
+    with _HTTP_SESSION_LOCK:
+        if _HTTP_SESSION is None:
+            session = requests.Session()
+            pool_size = max(GEOEDGE_FETCH_WORKERS, 1)
+            adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _HTTP_SESSION = session
+        return _HTTP_SESSION
+
+
+def iter_alerts_from_json_chunks(
+    chunks: Iterable[bytes],
+    fields: Tuple[str, ...] = GEOEDGE_ALERT_FIELDS,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Incrementally decode the alerts array of a GeoEdge alerts/history response body.
+    Handles both {"alerts": [...]} and {"response": {"alerts": [...]}} (whichever comes first in
+    the body; "alerts" keys nested anywhere else are skipped) and yields one alert at a time,
+    projected to `fields`, so only the current chunk and alert are held in memory.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    chunk_iter = iter(chunks)
+    buf = ""
+    pos = 0
+    exhausted = False
+
+    def read_more() -> None:
+        nonlocal buf, pos, exhausted
+        for chunk in chunk_iter:
+            if chunk:
+                buf = buf[pos:] + utf8.decode(chunk)
+                pos = 0
+                return
+        buf = buf[pos:] + utf8.decode(b"", final=True)
+        pos = 0
+        exhausted = True
+
+    def next_char() -> Optional[str]:
+        """Next non-whitespace character (not consumed), or None at the end of the body."""
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if exhausted:
+                return None
+            read_more()
+
+    def decode_value() -> Any:
+        nonlocal pos
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if exhausted:
+                    raise
+                read_more()  # value continues in the next chunk
+                continue
+            if end == len(buf) and not exhausted:
+                read_more()  # a number or literal may continue in the next chunk
+                continue
+            pos = end
+            return value
+
+    # Walk the top-level object (and its "response" object) up to the alerts array
+    if next_char() != "{":
+        return
+    pos += 1
+    in_response = False
+    while True:
+        char = next_char()
+        if char is None:
+            raise ValueError("Truncated GeoEdge response: no alerts array before the end of the body")
+        if char == ",":
+            pos += 1
+            continue
+        if char == "}":
+            if not in_response:
+                return
+            in_response = False
+            pos += 1
+            continue
+        key = decode_value()
+        if next_char() != ":":
+            raise ValueError(f"Malformed GeoEdge response: expected ':' after key {key!r}")
+        pos += 1
+        char = next_char()
+        if key == "alerts" and char == "[":
+            pos += 1
+            break
+        if key == "response" and char == "{" and not in_response:
+            pos += 1
+            in_response = True
+            continue
+        decode_value()  # any other member, skipped whole
+
+    # Decode array elements one by one
+    while True:
+        char = next_char()
+        if char is None:
+            raise ValueError("Truncated GeoEdge response: alerts array is not closed")
+        if char == ",":
+            pos += 1
+            continue
+        if char == "]":
+            return
+        alert = decode_value()
+        yield {field: alert[field] for field in fields if field in alert}
+
+
+_RESPONSE_CACHE: Optional[ResponseCache] = None
+
+
+_RESPONSE_CACHE_LOCK = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Return the shared GeoEdge response cache, or None if disabled/unavailable."""
+    global _RESPONSE_CACHE
+    if GEOEDGE_CACHE_TTL_SECONDS <= 0:
+        return None
+    with _RESPONSE_CACHE_LOCK:
+        if _RESPONSE_CACHE is None:
+            try:
+                _RESPONSE_CACHE = ResponseCache(
+                    GEOEDGE_CACHE_DIR,
+                    ttl_seconds=GEOEDGE_CACHE_TTL_SECONDS,
+                    max_bytes=GEOEDGE_CACHE_MAX_BYTES,
+                    bucket_seconds=GEOEDGE_CACHE_BUCKET_SECONDS,
+                )
+            except OSError as e:
+                log_message(f"⚠️ Could not open response cache ({e}) — fetching without it", WARNING)
+                return None
+        return _RESPONSE_CACHE
+
+
+def _fetch_trigger_alerts(
+    session: requests.Session,
+    url: str,
+    headers: Dict[str, str],
+    params: Dict[str, Any],
+    cache: Optional[ResponseCache] = None,
+) -> Dict[str, Any]:
+    """
+    Fetch one trigger type from GeoEdge, streaming and projecting the response body.
+    Served from the response cache when a fresh entry covers the requested window.
+    Returns a result dict with alerts, status_code, error, bytes, cached, data_to (end of the
+    window the alerts actually cover) and elapsed seconds; never raises.
+    """
+    started = time.perf_counter()
+    result: Dict[str, Any] = {
+        "alerts": [],
+        "status_code": None,
+        "error": None,
+        "bytes": 0,
+        "cached": False,
+        "data_to": params["to"],
+    }
+
+    cache_key = cache.key_for(params) if cache is not None else None
+    if cache_key is not None:
+        entry = cache.get(cache_key)
+        # Keys ignore `from`; the entry must start at or before this window (and not end at its start,
+        # as an earlier shard in the same `to` bucket would)
+        if entry is not None and entry["from"] <= params["from"] < entry["to"]:
+            result.update(alerts=entry["alerts"], status_code=200, cached=True, data_to=min(entry["to"], params["to"]))
+            result["elapsed"] = time.perf_counter() - started
+            return result
+
+    def counted(chunks: Iterable[bytes]) -> Iterator[bytes]:
+        for chunk in chunks:
+            result["bytes"] += len(chunk)
+            yield chunk
+
+    try:
+        with session.get(url, headers=headers, params=params, timeout=GEOEDGE_REQUEST_TIMEOUT, stream=True) as response:
+            result["status_code"] = response.status_code
+
+            if response.status_code == 200:
+                body = counted(response.iter_content(chunk_size=GEOEDGE_STREAM_CHUNK_BYTES))
+                result["alerts"] = list(iter_alerts_from_json_chunks(body))
+                if cache_key is not None:
+                    cache.put(cache_key, {"from": params["from"], "to": params["to"], "alerts": result["alerts"]})
 
     except Exception as e:
-        log_message(f"⚠️ Vertica status check failed ({e}) — including all campaigns to avoid false negatives")
-        return set(campaign_ids)  # Fail open: don't drop campaigns if Vertica is unreachable
+        result["error"] = str(e)
+
+    result["elapsed"] = time.perf_counter() - started
+    return result
+
+
+def _split_time_window(start_ts: int, end_ts: int, shard_seconds: int) -> List[Tuple[int, int]]:
+    """Split [start_ts, end_ts] into consecutive shards of at most shard_seconds (0 = no sharding)."""
+    if shard_seconds <= 0 or end_ts - start_ts <= shard_seconds:
+        return [(start_ts, end_ts)]
+    shards = []
+    shard_start = start_ts
+    while shard_start < end_ts:
+        shard_end = min(shard_start + shard_seconds, end_ts)
+        shards.append((shard_start, shard_end))
+        shard_start = shard_end
+    return shards
+
+
+class _RawAlertWindow:
+    """
+    Streaming mode's view of the rolling window in the alert store: every iteration reads the
+    triggers' alerts (for any of the locations) from a SQLite cursor, in fetch order, one at a time.
+    Nothing is held between iterations, so each flow streams its own pass.
+    """
+
+    def __init__(self, store: AlertStore, start_ts: int, trigger_type_ids: List[str], locations: set[str]):
+        self.store = store
+        self.start_ts = start_ts
+        self.trigger_type_ids = trigger_type_ids
+        self.locations = locations
+
+    def for_locations(self, locations: set[str]) -> "_RawAlertWindow":
+        """The same window narrowed to alerts in any of locations."""
+        return _RawAlertWindow(self.store, self.start_ts, self.trigger_type_ids, self.locations & locations)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for trigger_id in self.trigger_type_ids:
+            yield from self.store.iter_raw_alerts(self.start_ts, trigger_type_id=trigger_id, locations=self.locations)
+
+    def __bool__(self) -> bool:
+        rows = iter(self)
+        try:
+            return next(rows, None) is not None
+        finally:
+            rows.close()
 
 
 def fetch_alerts_from_geoedge(
     target_countries_csv: Optional[str] = None,
     flow_label: str = "Primary",
-) -> List[Dict[str, Any]]:
+    max_workers: Optional[int] = None,
+    incremental: Optional[bool] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    shard_hours: Optional[float] = None,
+    stream: bool = False,
+) -> Iterable[Dict[str, Any]]:
     """
     Fetch alerts for 3 trigger types: LP Change, Creative Change, Auto Redirect
     Target countries provided as CSV string.
+    Each trigger's window is split into shard_hours shards (default GEOEDGE_SHARD_HOURS, 0 = one
+    request per trigger); all trigger×shard requests run concurrently (up to max_workers, default
+    GEOEDGE_FETCH_WORKERS) over one shared session and are merged in trigger/time order, deduplicated
+    by event. Fetched alerts are upserted into the local alert store. In incremental mode (default
+    INCREMENTAL_FETCH) each trigger only requests the delta since its per-location watermarks and
+    the result is served from the store's rolling window.
+    Passing since/until runs a backfill over that window instead (no watermarks, no window reads).
+    With stream (incremental mode only), the rolling window is returned as a lazy _RawAlertWindow
+    over the store instead of a list.
     """
 
     target_countries_csv = target_countries_csv or ",".join(sorted(TARGET_LOCATIONS))
+    max_workers = GEOEDGE_FETCH_WORKERS if max_workers is None else max_workers
+    backfill = since is not None or until is not None
+    incremental = (INCREMENTAL_FETCH if incremental is None else incremental) and not backfill
+    if shard_hours is None:
+        shard_hours = GEOEDGE_BACKFILL_SHARD_HOURS if backfill else GEOEDGE_SHARD_HOURS
+    shard_seconds = int(shard_hours * 3600)
+    locations = {code.strip() for code in target_countries_csv.split(",") if code.strip()}
 
     api_key = _env_or_fail("GEOEDGE_API_KEY")
-    base_url = "https://api.geoedge.com/rest/analytics/v3/alerts/history"
+    base_url = f"{os.getenv('GEOEDGE_API_BASE', 'https://api.geoedge.com/rest/analytics/v3').rstrip('/')}/alerts/history"
 
     headers = {
         "Authorization": api_key,
         "Content-Type": "application/json",
     }
 
-    # Build 24-hour time window for the API call
-    now_utc = datetime.now(timezone.utc)
-    from_dt = now_utc - timedelta(hours=ALERT_CHECK_HOURS)
+    # Build 24-hour time window for the API call (or the requested backfill window)
+    now_utc = until or datetime.now(timezone.utc)
+    from_dt = since or now_utc - timedelta(hours=ALERT_CHECK_HOURS)
     from_ts = int(from_dt.timestamp())
     to_ts = int(now_utc.timestamp())
+    if from_ts >= to_ts:
+        raise ValueError(f"Empty fetch window: {from_dt} → {now_utc}")
 
     log_message(
         f"🔍 [{flow_label}] Fetching alerts for 3 trigger types targeting: {target_countries_csv} "
@@ -174,61 +705,181 @@ def fetch_alerts_from_geoedge(
     )
 
     # Define trigger types: LP Change, Creative Change, Auto Redirect
-    trigger_types = {
-        "25": "LP Change",
-        "35": "Creative Change",
-        "32": "Auto Redirect",  # Correct auto redirect trigger ID (was 14, now 32)
-    }
+    trigger_types = GEOEDGE_TRIGGER_TYPES
+
+    store = get_alert_store()
+    stream_window = stream and incremental and store is not None
+
+    requests_by_trigger: Dict[str, List[Dict[str, Any]]] = {}
+    for trigger_id in trigger_types:
+        trigger_from_ts = from_ts
+        if incremental and store is not None:
+            # Only go incremental when every requested location has a watermark for this trigger
+            marks = store.get_watermarks(trigger_id, locations)
+            if locations and len(marks) == len(locations):
+                trigger_from_ts = max(from_ts, min(marks.values()) - WATERMARK_OVERLAP_SECONDS)
+
+        requests_by_trigger[trigger_id] = [
+            {
+                "alert_id": "02d0f59e8dc68664c18d243b01ec0f55",
+                "trigger_type_id": trigger_id,
+                "full_raw": 1,
+                "location_id": target_countries_csv,
+                "from": shard_from_ts,
+                "to": shard_to_ts,
+            }
+            for shard_from_ts, shard_to_ts in _split_time_window(trigger_from_ts, to_ts, shard_seconds)
+        ]
+
+    tasks = [
+        ((trigger_id, shard_index), params)
+        for trigger_id, shard_params in requests_by_trigger.items()
+        for shard_index, params in enumerate(shard_params)
+    ]
+
+    session = _get_http_session()
+    cache = get_response_cache()
+    cache_stats_before = cache.stats() if cache is not None else None
+    fetch_started = time.perf_counter()
+    if max_workers > 1 and len(tasks) > 1:
+        workers = min(max_workers, len(tasks))
+        log_message(
+            f"⚡ [{flow_label}] Fetching {len(tasks)} requests ({len(requests_by_trigger)} trigger types) "
+            f"concurrently ({workers} workers)"
+        )
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                task_key: executor.submit(_fetch_trigger_alerts, session, base_url, headers, params, cache)
+                for task_key, params in tasks
+            }
+            results = {task_key: future.result() for task_key, future in futures.items()}
+    else:
+        results = {
+            task_key: _fetch_trigger_alerts(session, base_url, headers, params, cache)
+            for task_key, params in tasks
+        }
+    fetch_elapsed = time.perf_counter() - fetch_started
 
     all_alerts = []
+    seen_event_keys: set[str] = set()
 
-    # Try each trigger type separately
+    # Merge in trigger order (and shard time order) so output matches the sequential fetch
     for trigger_id, trigger_name in trigger_types.items():
         log_message(f"📡 [{flow_label}] Fetching {trigger_name} alerts (trigger_type_id={trigger_id})")
+        log_message(f"   URL: {base_url}", DEBUG)
+
+        alerts = []
+        trigger_ok = True
+        for shard_index, params in enumerate(requests_by_trigger[trigger_id]):
+            result = results[(trigger_id, shard_index)]
+            log_message(f"   Params: {params}", DEBUG)
+            if incremental and shard_index == 0 and params["from"] > from_ts:
+                log_message(
+                    f"   ↪️ Incremental: requesting delta since "
+                    f"{datetime.fromtimestamp(params['from'], timezone.utc).strftime('%Y-%m-%d %H:%M:%S')} UTC"
+                )
+
+            if result["error"]:
+                log_message(f"   ❌ {trigger_name} API error: {result['error']} ({result['elapsed']:.2f}s)", ERROR)
+                trigger_ok = False
+                continue
 
-        params = {
-            "alert_id": "02d0f59e8dc68664c18d243b01ec0f55",
-            "trigger_type_id": trigger_id,
-            "full_raw": 1,
-            "location_id": target_countries_csv,
-            "from": from_ts,
-            "to": to_ts,
-        }
-
-        try:
-            log_message(f"   URL: {base_url}")
-            log_message(f"   Params: {params}")
-
-            response = requests.get(base_url, headers=headers, params=params, timeout=60)
-
-            log_message(f"   Status Code: {response.status_code}")
-
-            if response.status_code == 200:
-                data = response.json()
-
-                # Check different possible alert locations in response
-                alerts = []
-                if "alerts" in data:
-                    alerts = data["alerts"]
-                elif "response" in data and "alerts" in data["response"]:
-                    alerts = data["response"]["alerts"]
-
-                if alerts:
-                    log_message(f"   ✅ Found {len(alerts)} {trigger_name} alerts")
+            if result["cached"]:
+                log_message(f"   🗄️ Served from response cache ({len(result['alerts'])} alerts, {result['elapsed']:.2f}s)")
+            else:
+                log_message(
+                    f"   Status Code: {result['status_code']} ({result['elapsed']:.2f}s, {result['bytes'] / 1024:.0f} KB streamed)"
+                )
 
-                    # Add trigger type info to each alert
-                    for alert in alerts:
-                        alert["trigger_type_name"] = trigger_name
+            if result["status_code"] != 200:
+                log_message(f"   ❌ {trigger_name} API failed with status {result['status_code']}", ERROR)
+                trigger_ok = False
+                continue
 
-                    all_alerts.extend(alerts)
-                else:
-                    log_message(f"   ⚠️ No {trigger_name} alerts found")
+            # Shards can overlap at their boundaries; keep each event once
+            for alert in result["alerts"]:
+                event_key = _alert_event_key(alert)
+                if event_key not in seen_event_keys:
+                    seen_event_keys.add(event_key)
+                    alerts.append(alert)
 
-            else:
-                log_message(f"   ❌ {trigger_name} API failed with status {response.status_code}")
+        if alerts:
+            log_message(f"   ✅ Found {len(alerts)} {trigger_name} alerts")
+
+            # Add trigger type info to each alert
+            for alert in alerts:
+                alert["trigger_type_name"] = trigger_name
+        elif trigger_ok:
+            log_message(f"   ⚠️ No {trigger_name} alerts found")
+
+        if store is not None:
+            # Merge the delta into the rolling window; advance watermarks only when every shard succeeded
+            store.upsert_raw_alerts(
+                {
+                    "event_key": _alert_event_key(alert),
+                    "trigger_type_id": trigger_id,
+                    "event_ts": _parse_event_timestamp(alert.get("event_datetime")) or to_ts,
+                    "alert": alert,
+                    "backfilled": backfill,
+                }
+                for alert in alerts
+            )
+            if trigger_ok and not backfill:
+                # Cached responses may end before their shard does; never move the watermark past fetched data
+                covered_to_ts = to_ts
+                for shard_index, params in enumerate(requests_by_trigger[trigger_id]):
+                    data_to = results[(trigger_id, shard_index)]["data_to"]
+                    if data_to < params["to"]:
+                        covered_to_ts = data_to
+                        break
+                store.set_watermarks(trigger_id, locations, covered_to_ts)
+
+        if stream_window:
+            continue  # read lazily through the _RawAlertWindow returned below
+        if incremental and store is not None:
+            window_alerts = store.query_raw_alerts(from_ts, trigger_type_id=trigger_id, locations=locations)
+            log_message(f"   📥 {trigger_name}: {len(window_alerts)} alerts in rolling {ALERT_CHECK_HOURS}h window")
+            all_alerts.extend(window_alerts)
+        else:
+            all_alerts.extend(alerts)
+
+    if store is not None and not backfill:
+        retention_start_ts = to_ts - ALERT_STORE_RETENTION_DAYS * 86400
+        store.prune_raw_alerts(retention_start_ts)
+        store.prune_enriched_alerts(retention_start_ts)
+
+    record_count("geoedge_requests", len(tasks))
+    record_count("geoedge_payload_bytes", sum(result["bytes"] for result in results.values()))
+    if not stream_window:
+        record_count("alerts_fetched", len(all_alerts))
+
+    latency_by_trigger: Dict[str, float] = {}
+    for (trigger_id, _), result in results.items():
+        latency_by_trigger[trigger_id] = max(latency_by_trigger.get(trigger_id, 0.0), result["elapsed"])
+    latency_summary = ", ".join(
+        f"{trigger_types[trigger_id]} {elapsed:.2f}s" for trigger_id, elapsed in latency_by_trigger.items()
+    )
+    log_message(
+        f"⏱️ [{flow_label}] Fetch took {fetch_elapsed:.2f}s for {len(tasks)} requests "
+        f"(slowest request per trigger: {latency_summary})"
+    )
 
-        except Exception as e:
-            log_message(f"   ❌ {trigger_name} API error: {str(e)}")
+    if cache is not None:
+        cache_stats = cache.stats()
+        hits = cache_stats["hits"] - cache_stats_before["hits"]
+        misses = cache_stats["misses"] - cache_stats_before["misses"]
+        hit_rate = hits / (hits + misses) * 100 if hits + misses else 0.0
+        record_count("response_cache_lookups", hits + misses)
+        record_count("response_cache_hits", hits)
+        log_message(
+            f"🗄️ [{flow_label}] Response cache: {hits} hits, {misses} misses ({hit_rate:.0f}% hit rate), "
+            f"{cache_stats['expired'] - cache_stats_before['expired']} expired, "
+            f"{cache_stats['evicted'] - cache_stats_before['evicted']} evicted"
+        )
+
+    if stream_window:
+        log_message(f"📥 [{flow_label}] Rolling {ALERT_CHECK_HOURS}h window will be streamed from the alert store")
+        return _RawAlertWindow(store, from_ts, list(trigger_types), locations)
 
     if all_alerts:
         log_message(f"✅ [{flow_label}] TOTAL SUCCESS: Found {len(all_alerts)} alerts across all trigger types")
@@ -253,26 +904,267 @@ def fetch_alerts_from_geoedge(
         for location, count in location_counts.items():
             log_message(f"   {location}: {count} alerts")
 
-        # Show sample alert structure
-        log_message("📋 SAMPLE ALERT DATA:")
-        log_message("=" * 60)
+        # Show sample alert structure (DEBUG only)
+        log_message("📋 SAMPLE ALERT DATA:", DEBUG)
+        log_message("=" * 60, DEBUG)
 
         if len(all_alerts) > 0:
             alert = all_alerts[0]
-            log_message(f"Alert Keys: {list(alert.keys())}")
-            log_message(f"Trigger Type: {alert.get('trigger_type_id')} - {alert.get('trigger_type_name')}")
-            log_message(f"Location: {alert.get('location')}")
-            log_message(f"Alert Name: {alert.get('alert_name')}")
-            log_message(f"Event Time: {alert.get('event_datetime')}")
-            log_message(f"Project Name: {alert.get('project_name')}")
-
-        log_message("=" * 60)
+            log_message(f"Alert Keys: {list(alert.keys())}", DEBUG)
+            log_message(f"Trigger Type: {alert.get('trigger_type_id')} - {alert.get('trigger_type_name')}", DEBUG)
+            log_message(f"Location: {alert.get('location')}", DEBUG)
+            log_message(f"Alert Name: {alert.get('alert_name')}", DEBUG)
+            log_message(f"Event Time: {alert.get('event_datetime')}", DEBUG)
+            log_message(f"Project Name: {alert.get('project_name')}", DEBUG)
+
+        log_message("=" * 60, DEBUG)
         return all_alerts
 
-    log_message("❌ No alerts found for any trigger type")
+    log_message("❌ No alerts found for any trigger type", ERROR)
     return []
 
 
+def _project_rows_sql(placeholder_count: int) -> str:
+    """Project→campaign/publisher join for an IN list of placeholder_count project_ids."""
+
+    # Build country lists dynamically from config so SQL stays in sync
+    latam_sql = ", ".join(f"'{c}'" for c in sorted(LATAM_COUNTRIES))
+    china_sql = ", ".join(f"'{c}'" for c in sorted(GREATER_CHINA_COUNTRIES))
+    publisher_countries_sql = ", ".join(f"'{c}'" for c in sorted(LATAM_COUNTRIES | GREATER_CHINA_COUNTRIES))
+
+    # Create placeholders for IN clause
+    placeholders = ','.join(['%s'] * placeholder_count)
+
+    return f"""
+        SELECT DISTINCT
+            p.project_id,
+            p.campaign_id,
+            lp.advertiser_id as account_id,
+            pub.name as account_name,
+            pub.country,
+            pub.name as publisher_name,
+            p.locations,
+            CASE
+                WHEN pub.country IN ({latam_sql}) THEN 'LATAM'
+                WHEN pub.country IN ({china_sql}) THEN 'Greater China'
+                ELSE 'Other'
+            END AS region_type
+        FROM trc.geo_edge_projects p
+        JOIN trc.geo_edge_landing_pages lp ON p.campaign_id = lp.campaign_id
+        JOIN trc.publishers pub ON lp.advertiser_id = pub.id
+        WHERE p.project_id IN ({placeholders})
+            AND p.scan_status = 'SCANNING'
+            AND pub.country IN ({publisher_countries_sql})
+    """
+
+
+def _query_project_rows(
+    project_ids: List[str],
+    on_rows: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Run the project→campaign/publisher join in MySQL in chunks of MYSQL_IN_CHUNK_SIZE ids,
+    up to MYSQL_QUERY_WORKERS chunks in parallel over the pooled MySQL connections. Each chunk is
+    read through a server-side streaming cursor; on_rows (if given) is called from the worker
+    thread with every batch as it arrives. Rows are grouped into the result as each chunk
+    completes. Returns {project_id: rows}; raises on DB errors.
+    """
+    project_data: Dict[str, List[Dict[str, Any]]] = {}
+    chunk_size = max(MYSQL_IN_CHUNK_SIZE, 1)
+    chunks = [project_ids[i:i + chunk_size] for i in range(0, len(project_ids), chunk_size)]
+    if not chunks:
+        return project_data
+
+    pool = get_mysql_pool()
+
+    def query_chunk(chunk: List[str]) -> List[Dict[str, Any]]:
+        rows: List[Dict[str, Any]] = []
+        with pool.connection() as connection:
+            with connection.cursor(pymysql.cursors.SSDictCursor) as cursor:
+                cursor.execute(_project_rows_sql(len(chunk)), chunk)
+                while True:
+                    batch = cursor.fetchmany(MYSQL_STREAM_BATCH_ROWS)
+                    if not batch:
+                        break
+                    rows.extend(batch)
+                    if on_rows is not None:
+                        on_rows(batch)
+        return rows
+
+    def add_rows(results: List[Dict[str, Any]]) -> None:
+        # Group results by project_id for fast lookup
+        for result in results:
+            project_id = result["project_id"]
+            if project_id not in project_data:
+                project_data[project_id] = []
+            project_data[project_id].append(result)
+
+    total_rows = 0
+    workers = min(MYSQL_QUERY_WORKERS, len(chunks))
+    if workers > 1:
+        log_message(f"⚡ Querying {len(project_ids)} projects in {len(chunks)} chunks ({workers} pooled connections)", DEBUG)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(query_chunk, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                results = future.result()
+                total_rows += len(results)
+                add_rows(results)
+    else:
+        for chunk in chunks:
+            results = query_chunk(chunk)
+            total_rows += len(results)
+            add_rows(results)
+
+    return project_data
+
+
+def load_project_data(
+    project_ids: List[str],
+    on_rows: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Read-through cache over _query_project_rows: fresh rows (PROJECT_CACHE_TTL_SECONDS) come from
+    the local alert store and only uncached project_ids reach MySQL. Projects with no matching rows
+    are cached too. on_rows receives cached rows up front and MySQL rows as they stream in.
+    Returns {project_id: rows} for projects that have rows.
+    """
+    project_data, cache_hits, mysql_rows = _load_project_data(project_ids, on_rows)
+    _log_project_lookups(len(project_ids), cache_hits, mysql_rows)
+    return project_data
+
+
+def _load_project_data(
+    project_ids: List[str],
+    on_rows: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+) -> Tuple[Dict[str, List[Dict[str, Any]]], int, Optional[int]]:
+    """
+    Body of load_project_data without the summary lines (only failures are logged).
+    Returns (project_data, projects served from the cache, rows MySQL returned or None if not queried).
+    """
+    store = get_alert_store() if PROJECT_CACHE_TTL_SECONDS > 0 else None
+    cached: Dict[str, List[Dict[str, Any]]] = {}
+    if store is not None:
+        try:
+            cached = store.get_cached_projects(project_ids, PROJECT_CACHE_TTL_SECONDS)
+        except Exception as e:
+            log_message(f"⚠️ Project cache read failed ({e}) — querying MySQL for all projects", WARNING)
+
+    uncached_ids = [pid for pid in project_ids if pid not in cached]
+    record_count("project_cache_lookups", len(project_ids))
+    record_count("project_cache_hits", len(cached))
+
+    if on_rows is not None:
+        cached_rows = [row for rows in cached.values() for row in rows]
+        if cached_rows:
+            on_rows(cached_rows)
+
+    fetched: Dict[str, List[Dict[str, Any]]] = {}
+    mysql_rows = None
+    if uncached_ids:
+        with record_span("mysql"):
+            fetched = _query_project_rows(uncached_ids, on_rows)
+        mysql_rows = sum(len(rows) for rows in fetched.values())
+        record_count("mysql_rows", mysql_rows)
+        if store is not None:
+            try:
+                store.cache_projects({pid: fetched.get(pid, []) for pid in uncached_ids})
+            except Exception as e:
+                log_message(f"⚠️ Could not update project cache: {e}", WARNING)
+
+    project_data = {pid: rows for pid, rows in cached.items() if rows}
+    project_data.update(fetched)
+    return project_data, len(cached), mysql_rows
+
+
+def _log_project_lookups(lookups: int, cache_hits: int, mysql_rows: Optional[int]) -> None:
+    """Project cache / MySQL summary for a flow's enrichment."""
+    hit_rate = cache_hits / lookups * 100 if lookups else 0.0
+    log_message(
+        f"🗃️ Project cache: {cache_hits}/{lookups} projects served from cache ({hit_rate:.0f}% hit rate), "
+        f"{lookups - cache_hits} queried from MySQL"
+    )
+    if mysql_rows is not None:
+        log_message(f"📊 Batch query returned {mysql_rows} matching records")
+
+
+class _ActiveCampaignPipeline:
+    """
+    Collects campaign IDs from enrichment rows as they arrive and submits Vertica status checks
+    in batches of batch_size, so Vertica runs while MySQL is still streaming. Thread-safe.
+    Create it on the flow's thread: batches record into that flow's metrics and log block, and
+    result() logs one status summary for the whole flow. Campaign IDs already in `seen` (shared
+    across pipelines, e.g. one per streaming chunk) are not checked again.
+    """
+
+    def __init__(self, executor: ThreadPoolExecutor, batch_size: int, seen: Optional[set] = None):
+        self._executor = executor
+        # Bound here, not at submit time: add_rows is called from the MySQL worker threads
+        self._check = bind_flow_log(bind_metrics(_check_campaign_statuses))
+        self._batch_size = max(batch_size, 1)
+        self._lock = threading.Lock()
+        self._seen: set = set() if seen is None else seen
+        self._pending: List[Any] = []
+        self._futures: List[Any] = []
+
+    def add_rows(self, rows: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            for row in rows:
+                campaign_id = row["campaign_id"]
+                if campaign_id not in self._seen:
+                    self._seen.add(campaign_id)
+                    self._pending.append(campaign_id)
+            while len(self._pending) >= self._batch_size:
+                batch, self._pending = self._pending[:self._batch_size], self._pending[self._batch_size:]
+                self._futures.append(self._executor.submit(self._check, batch))
+
+    def collect(self) -> Tuple[set, int]:
+        """Flush the last partial batch; return (active campaign IDs, status cache hits) without logging."""
+        with self._lock:
+            if self._pending:
+                self._futures.append(self._executor.submit(self._check, self._pending))
+                self._pending = []
+            futures = list(self._futures)
+        active_ids = set()
+        cache_hits = 0
+        for future in futures:
+            batch_active_ids, batch_cache_hits = future.result()
+            active_ids |= batch_active_ids
+            cache_hits += batch_cache_hits
+        return active_ids, cache_hits
+
+    def result(self) -> set:
+        """Flush the last partial batch and return the union of active campaign IDs."""
+        active_ids, cache_hits = self.collect()
+        with self._lock:
+            campaign_ids = set(self._seen)
+        if campaign_ids:
+            _log_campaign_statuses(campaign_ids, active_ids, cache_hits)
+        return active_ids
+
+
+_COLUMNAR_FALLBACK_LOGGED = False
+
+
+def _use_columnar_matching() -> bool:
+    """COLUMNAR_MATCHING is on and NumPy is importable (warns once and uses the loop otherwise)."""
+    global _COLUMNAR_FALLBACK_LOGGED
+    if not COLUMNAR_MATCHING:
+        return False
+    if columnar_available():
+        return True
+    if not _COLUMNAR_FALLBACK_LOGGED:
+        _COLUMNAR_FALLBACK_LOGGED = True
+        log_message("⚠️ COLUMNAR_MATCHING is on but NumPy is not installed — using the row-by-row matcher", WARNING)
+    return False
+
+
+def _shard_workers(alert_count: int) -> int:
+    """Process count for sharded matching/grouping of alert_count alerts (0 = stay in-process)."""
+    if SHARD_WORKERS > 1 and alert_count >= SHARD_MIN_ALERTS:
+        return SHARD_WORKERS
+    return 0
+
+
 def process_alerts_to_target_regions(
     alerts: List[Dict[str, Any]],
     target_countries: Optional[set[str]] = None,
@@ -288,10 +1180,60 @@ def process_alerts_to_target_regions(
         f"🏢 Processing {len(alerts)} alerts to find LATAM/Greater China publishers targeting {', '.join(sorted(target_countries))}"
     )
 
+    record_count("alerts_in", len(alerts))
     if not alerts:
         return []
 
     # Step 1: Filter alerts by target countries (fast, no DB queries)
+    filtered_alerts = _filter_target_alerts(alerts, target_countries)
+    log_message(
+        f"📊 Filtered to {len(filtered_alerts)} alerts from target locations ({', '.join(sorted(target_countries))})"
+    )
+    
+    if not filtered_alerts:
+        return []
+    
+    # Step 2: Extract unique project IDs for batch query
+    unique_project_ids = list(set(alert["project_id"] for alert in filtered_alerts))
+    log_message(f"🔍 Querying database for {len(unique_project_ids)} unique projects")
+    
+    # Step 3+4: Batch query for projects not already in the local project cache, then the
+    # Vertica active-campaign filter — drop STOPPED/TERMINATED/REJECTED campaigns.
+    # Pipelined mode sends campaign-ID batches to Vertica while MySQL rows are still streaming.
+    try:
+        with record_span("enrich"):
+            if PIPELINED_STAGES:
+                with ThreadPoolExecutor(max_workers=VERTICA_POOL_SIZE) as vertica_executor:
+                    status_pipeline = _ActiveCampaignPipeline(vertica_executor, VERTICA_IN_CHUNK_SIZE)
+                    project_data = load_project_data(unique_project_ids, on_rows=status_pipeline.add_rows)
+                    active_campaign_ids = status_pipeline.result()
+            else:
+                project_data = load_project_data(unique_project_ids)
+                all_candidate_ids = [
+                    result["campaign_id"]
+                    for results in project_data.values()
+                    for result in results
+                ]
+                active_campaign_ids = filter_active_campaigns(list(set(all_candidate_ids)))
+    except MySQLError as e:
+        log_message(f"❌ Database error: {str(e)}", ERROR)
+        return []
+    except Exception as e:
+        log_message(f"❌ Error in batch query: {str(e)}", ERROR)
+        return []
+
+    # Step 5: Match alerts with project data (fast lookup)
+    matching_alerts, skipped_inactive, skipped_off_target, missing_project_data = _match_alerts(
+        filtered_alerts, project_data, active_campaign_ids, target_countries
+    )
+    _log_match_summary(
+        len(filtered_alerts), len(matching_alerts), skipped_inactive, skipped_off_target, missing_project_data, target_countries
+    )
+    return matching_alerts
+
+
+def _filter_target_alerts(alerts: Iterable[Dict[str, Any]], target_countries: set[str]) -> List[AlertRecord]:
+    """Alerts with a location in target_countries and a project, as AlertRecords (no DB queries)."""
     filtered_alerts = []
     
     for alert in alerts:
@@ -322,153 +1264,118 @@ def process_alerts_to_target_regions(
             project_id = project_ids[0]
             project_name = project_name_dict[project_id]
             
-            enhanced_alert = alert.copy()
-            enhanced_alert.update({
-                "location_code": location_code,
-                "location_name": location_name,
-                "project_id": project_id,
-                "project_name": project_name
-            })
-            filtered_alerts.append(enhanced_alert)
-    
-    log_message(
-        f"📊 Filtered to {len(filtered_alerts)} alerts from target locations ({', '.join(sorted(target_countries))})"
-    )
-    
-    if not filtered_alerts:
-        return []
-    
-    # Step 2: Extract unique project IDs for batch query
-    unique_project_ids = list(set(alert["project_id"] for alert in filtered_alerts))
-    log_message(f"🔍 Querying database for {len(unique_project_ids)} unique projects")
-    
-    # Step 3: Single batch query for all projects
-    project_data = {}
-    try:
-        connection = get_database_connection()
-
-        # Build country lists dynamically from config so SQL stays in sync
-        latam_sql = ", ".join(f"'{c}'" for c in sorted(LATAM_COUNTRIES))
-        china_sql = ", ".join(f"'{c}'" for c in sorted(GREATER_CHINA_COUNTRIES))
-        publisher_countries_sql = ", ".join(f"'{c}'" for c in sorted(LATAM_COUNTRIES | GREATER_CHINA_COUNTRIES))
-
-        with connection.cursor() as cursor:
-            # Create placeholders for IN clause
-            placeholders = ','.join(['%s'] * len(unique_project_ids))
-
-            sql = f"""
-                SELECT DISTINCT
-                    p.project_id,
-                    p.campaign_id,
-                    lp.advertiser_id as account_id,
-                    pub.name as account_name,
-                    pub.country,
-                    pub.name as publisher_name,
-                    p.locations,
-                    CASE
-                        WHEN pub.country IN ({latam_sql}) THEN 'LATAM'
-                        WHEN pub.country IN ({china_sql}) THEN 'Greater China'
-                        ELSE 'Other'
-                    END AS region_type
-                FROM trc.geo_edge_projects p
-                JOIN trc.geo_edge_landing_pages lp ON p.campaign_id = lp.campaign_id
-                JOIN trc.publishers pub ON lp.advertiser_id = pub.id
-                WHERE p.project_id IN ({placeholders})
-                    AND p.scan_status = 'SCANNING'
-                    AND pub.country IN ({publisher_countries_sql})
-            """
-            
-            cursor.execute(sql, unique_project_ids)
-            results = cursor.fetchall()
-            
-            log_message(f"📊 Batch query returned {len(results)} matching records")
-            
-            # Group results by project_id for fast lookup
-            for result in results:
-                project_id = result["project_id"]
-                if project_id not in project_data:
-                    project_data[project_id] = []
-                project_data[project_id].append(result)
-        
-        connection.close()
-        
-    except MySQLError as e:
-        log_message(f"❌ Database error: {str(e)}")
-        return []
-    except Exception as e:
-        log_message(f"❌ Error in batch query: {str(e)}")
-        return []
+            # Slotted record referencing the raw alert; no per-alert dict copy
+            filtered_alerts.append(AlertRecord(alert, location_code, location_name, project_id, project_name))
     
-    # Step 4: Vertica active-campaign filter — drop STOPPED/TERMINATED/REJECTED campaigns
-    all_candidate_ids = [
-        result["campaign_id"]
-        for results in project_data.values()
-        for result in results
-    ]
-    active_campaign_ids = filter_active_campaigns(list(set(all_candidate_ids)))
+    return filtered_alerts
 
-    # Step 5: Match alerts with project data (fast lookup)
-    matching_alerts = []
 
-    for alert in filtered_alerts:
-        project_id = alert["project_id"]
-        location_code = alert["location_code"]
-        location_name = alert["location_name"]
+def _match_alerts(
+    filtered_alerts: List[AlertRecord],
+    project_data: Dict[str, List[Dict[str, Any]]],
+    active_campaign_ids: set,
+    target_countries: set[str],
+) -> Tuple[List[AlertRecord], int, int, int]:
+    """
+    Join filtered alerts with their project rows, keeping active campaigns that target target_countries.
+    Returns (matching alerts, skipped inactive, skipped off-target, alerts without project data).
+    """
+    # Per-alert lines are DEBUG only; INFO gets the aggregated counters (_log_match_summary)
+    matching_alerts = []
+    debug = log_enabled(DEBUG)
+    skipped_inactive = 0
+    skipped_off_target = 0
+    missing_project_data = 0
+    target_mask = country_mask(target_countries)
+
+    # Sharded and columnar engines: same matches and counters, without the per-alert DEBUG lines
+    engine_result = None
+    shard_workers = 0 if debug else _shard_workers(len(filtered_alerts))
+    if shard_workers:
+        try:
+            engine_result = match_alerts_sharded(
+                filtered_alerts, project_data, active_campaign_ids, target_countries, shard_workers
+            )
+        except (OSError, BrokenProcessPool) as e:
+            log_message(f"⚠️ Sharded matching failed ({e}) — matching in-process", WARNING)
+    if engine_result is None and not debug and _use_columnar_matching():
+        engine_result = match_alerts_columnar(filtered_alerts, project_data, active_campaign_ids, target_mask)
+
+    if engine_result is not None:
+        matching_alerts, skipped_inactive, skipped_off_target, missing_project_data = engine_result
+    else:
+        for alert in filtered_alerts:
+            project_id = alert["project_id"]
+            location_code = alert["location_code"]
+            location_name = alert["location_name"]
         
-        log_message(f"  🔍 Processing alert: {alert.get('alert_id', 'Unknown')} from {location_code} ({location_name})")
+            if debug:
+                log_message(
+                    f"  🔍 Processing alert: {alert.get('alert_id', 'Unknown')} from {location_code} ({location_name})", DEBUG
+                )
         
-        if project_id in project_data:
-            for result in project_data[project_id]:
-                campaign_id = result["campaign_id"]
-                account_id = result["account_id"]
-                account_name = result.get("account_name", "Unknown")
-                country = result["country"]
-                publisher_name = result["publisher_name"]
-                locations = result["locations"]
-                region_type = result["region_type"]
-
-                # Skip campaigns that are not APPROVED+RUNNING in Taboola (Vertica check)
-                if campaign_id not in active_campaign_ids:
-                    log_message(f"    🚫 SKIPPED! Campaign {campaign_id} is not active (STOPPED/TERMINATED/REJECTED)")
-                    continue
-
-                # Check if campaign targets our desired locations (US, GB, CA, AU)
-                # Handle both "US,CA,GB,DE" and "US, CA, GB, DE" formats
-                if locations:
-                    # Split by comma and strip whitespace from each country code
-                    campaign_target_countries = set(loc.strip() for loc in locations.split(","))
-                else:
-                    campaign_target_countries = set()
-                
-                # Only include campaigns that target at least one of our specified countries
-                if campaign_target_countries and not campaign_target_countries.intersection(target_countries):
-                    log_message(
-                        f"    ❌ SKIPPED! Campaign doesn't target any of our focus countries ({', '.join(sorted(target_countries))})"
-                    )
-                    continue
+            if project_id in project_data:
+                for result in project_data[project_id]:
+                    campaign_id = result["campaign_id"]
+                    locations = result["locations"]
+
+                    # Skip campaigns that are not APPROVED+RUNNING in Taboola (Vertica check)
+                    if campaign_id not in active_campaign_ids:
+                        skipped_inactive += 1
+                        if debug:
+                            log_message(
+                                f"    🚫 SKIPPED! Campaign {campaign_id} is not active (STOPPED/TERMINATED/REJECTED)", DEBUG
+                            )
+                        continue
+
+                    # Only include campaigns that target at least one of our specified countries
+                    # (each distinct "US,CA,GB,DE" / "US, CA, GB, DE" string is parsed once into a bitmask)
+                    if locations and not locations_mask(locations) & target_mask:
+                        skipped_off_target += 1
+                        if debug:
+                            log_message(
+                                f"    ❌ SKIPPED! Campaign doesn't target any of our focus countries ({', '.join(sorted(target_countries))})",
+                                DEBUG,
+                            )
+                        continue
                 
-                log_message(f"    ✅ MATCH! Found {region_type} campaign - Publisher: {publisher_name} ({country})")
+                    if debug:
+                        log_message(
+                            f"    ✅ MATCH! Found {result['region_type']} campaign - Publisher: {result['publisher_name']} ({result['country']})",
+                            DEBUG,
+                        )
                 
-                enhanced_alert = alert.copy()
-                enhanced_alert.update({
-                    "campaign_id": campaign_id,
-                    "account_id": account_id,
-                    "account_name": account_name,
-                    "publisher_country": country,
-                    "publisher_name": publisher_name,
-                    "campaign_locations": locations,
-                    "region_type": region_type
-                })
-                
-                matching_alerts.append(enhanced_alert)
-        else:
-            log_message(f"    ❌ No target region data found for project {project_id}")
+                    # Shares the raw alert and the cached project row with every other match
+                    matching_alerts.append(alert.with_row(result))
+            else:
+                missing_project_data += 1
+                if debug:
+                    log_message(f"    ❌ No target region data found for project {project_id}", DEBUG)
+
+    return matching_alerts, skipped_inactive, skipped_off_target, missing_project_data
+
+
+def _log_match_summary(
+    filtered_count: int,
+    matched_count: int,
+    skipped_inactive: int,
+    skipped_off_target: int,
+    missing_project_data: int,
+    target_countries: set[str],
+) -> None:
+    """Aggregated match counters for a flow (per-alert lines are DEBUG only)."""
+    record_count("alerts_filtered", filtered_count)
+    record_count("alerts_matched", matched_count)
+    log_message(
+        f"🧮 Matched {matched_count} campaign alerts from {filtered_count} alerts — "
+        f"{skipped_inactive} inactive campaigns skipped, {skipped_off_target} off-target campaigns skipped, "
+        f"{missing_project_data} alerts without LATAM/Greater China project data"
+    )
     
     target_locations_str = ", ".join(sorted(target_countries))
     log_message(
-        f"✅ Found {len(matching_alerts)} LATAM/Greater China campaigns targeting {target_locations_str}"
+        f"✅ Found {matched_count} LATAM/Greater China campaigns targeting {target_locations_str}"
     )
-    return matching_alerts
 
 
 def send_alert_email(
@@ -478,8 +1385,12 @@ def send_alert_email(
     target_label: str,
     cc_recipients: Optional[List[str]] = None,
     subject: Optional[str] = None,
+    region_groups: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None,
 ) -> bool:
-    """Send email alert with LP changes for the given target set."""
+    """
+    Send email alert with LP changes for the given target set.
+    Pass region_groups (from the streaming pipeline) instead of alerts to render pre-grouped alerts.
+    """
 
     try:
         # SMTP configuration
@@ -499,24 +1410,34 @@ def send_alert_email(
         # Generate email content (and CSV report if alerts exist)
         csv_content = None
         csv_filename = None
-        if alerts:
-            html_content, csv_content, csv_filename = generate_alert_email_html(alerts, target_locations, target_label)
-        else:
-            html_content = generate_no_alerts_email_html(target_label)
+        with record_span("render"):
+            if region_groups is not None and any(region_groups.values()):
+                html_content, csv_content, csv_filename = _render_report(
+                    region_groups, target_locations, target_label, max_table_rows=STREAM_HTML_MAX_ROWS
+                )
+            elif alerts:
+                html_content, csv_content, csv_filename = generate_alert_email_html(alerts, target_locations, target_label)
+            else:
+                html_content = generate_no_alerts_email_html(target_label)
+        record_count("html_bytes", len(html_content.encode("utf-8")))
+        # Encoded once: the same bytes are measured and attached
+        csv_bytes = csv_content.encode("utf-8") if csv_content else None
+        if csv_bytes:
+            record_count("csv_bytes", len(csv_bytes))
 
         # Attach HTML content
-        html_part = MIMEText(html_content, "html")
+        html_part = MIMEText(html_content, "html", "utf-8")
         msg.attach(html_part)
 
         # Attach CSV report when available so email clients can download reliably
-        if csv_content and csv_filename:
-            csv_part = MIMEApplication(csv_content.encode("utf-8"), _subtype="csv")
+        if csv_bytes and csv_filename:
+            csv_part = MIMEApplication(csv_bytes, _subtype="csv")
             csv_part.add_header("Content-Disposition", "attachment", filename=csv_filename)
             csv_part.add_header("Content-ID", "<lp-alerts-report>")
             msg.attach(csv_part)
 
         # Send email
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
+        with record_span("smtp"), smtplib.SMTP(smtp_server, smtp_port) as server:
             # Only use STARTTLS if port is 587 (standard TLS port)
             if smtp_port == 587:
                 server.starttls()
@@ -526,17 +1447,121 @@ def send_alert_email(
                 server.login(smtp_user, smtp_password)
 
             all_recipients = recipients + (cc_recipients or [])
-            text = msg.as_string()
-            server.sendmail(smtp_user or EMAIL_SETTINGS["from_address"], all_recipients, text)
+            message_bytes = msg.as_bytes()
+            record_count("email_bytes", len(message_bytes))
+            server.sendmail(smtp_user or EMAIL_SETTINGS["from_address"], all_recipients, message_bytes)
 
         log_message(f"✅ Email sent successfully to {len(recipients)} recipients")
         return True
 
     except Exception as e:
-        log_message(f"❌ Failed to send email: {str(e)}")
+        log_message(f"❌ Failed to send email: {str(e)}", ERROR)
         return False
 
 
+def group_alerts_for_report(
+    region_alerts: List[Dict[str, Any]],
+    first_seen: Optional[Dict[str, int]] = None,
+    grouped_alerts: Optional[Dict[str, Dict[str, Any]]] = None,
+    max_urls: Optional[int] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Group one region's alerts by account_id + trigger type (+ publisher country and campaign locations)
+    for the email table and CSV. Each group maps campaign_id -> list of alert URLs.
+    first_seen, if given, receives each group key's position of its first alert in region_alerts.
+    grouped_alerts, if given, is extended in place (the streaming pipeline feeds it chunk by chunk);
+    max_urls caps the URLs kept per campaign (the table and CSV only show the first).
+    """
+    if grouped_alerts is None:
+        grouped_alerts = {}
+    for position, alert in enumerate(region_alerts):
+        account_id = alert.get("account_id", "Unknown")
+        account_name = alert.get("account_name", "Unknown")
+        publisher_country = alert.get("publisher_country", "Unknown")
+        campaign_locations = alert.get("campaign_locations", "Unknown")
+        
+        # Get proper trigger name
+        trigger_name = alert.get("trigger_type_name", "Unknown")
+        if trigger_name == "Unknown":
+            trigger_id = alert.get("trigger_type_id")
+            trigger_id_str = str(trigger_id) if trigger_id is not None else ""
+            if trigger_id_str == "25":
+                trigger_name = "LP CHANGE"
+            elif trigger_id_str == "35":
+                trigger_name = "CREATIVE CHANGE"
+            elif trigger_id_str == "32":
+                trigger_name = "AUTO REDIRECT"
+        
+        recurrence_status = alert.get("recurrence_status", "NEW")
+
+        # Create unique key for grouping by account + alert type
+        group_key = f"{account_id}|{trigger_name}|{publisher_country}|{campaign_locations}"
+
+        if group_key not in grouped_alerts:
+            if first_seen is not None:
+                first_seen[group_key] = position
+            grouped_alerts[group_key] = {
+                "account_id": account_id,
+                "account_name": account_name,
+                "publisher_country": publisher_country,
+                "campaign_locations": campaign_locations,
+                "trigger_name": trigger_name,
+                "campaign_data": {},  # Store campaign_id -> list of alert_details_urls mapping
+                "campaign_stats": {},  # campaign_id -> (frequency, streak) from the recurrence counters
+                "recurrence_status": recurrence_status,
+            }
+        elif recurrence_status == "NEW":
+            # Promote group to NEW if any alert in it is new
+            grouped_alerts[group_key]["recurrence_status"] = "NEW"
+        
+        # Add campaign ID and its alert URL to the group
+        campaign_id = alert.get("campaign_id", "Unknown")
+        alert_details_url = alert.get("alert_details_url", "")
+        
+        # Store all alert_details_urls for this campaign (list of URLs)
+        if campaign_id not in grouped_alerts[group_key]["campaign_data"]:
+            grouped_alerts[group_key]["campaign_data"][campaign_id] = []
+
+        # Keep the highest counters seen for the campaign (later duplicates in a run count higher)
+        if "recurrence_frequency" in alert:
+            stats = (alert["recurrence_frequency"], alert.get("recurrence_streak", 0))
+            previous = grouped_alerts[group_key]["campaign_stats"].get(campaign_id)
+            if previous is None or stats > previous:
+                grouped_alerts[group_key]["campaign_stats"][campaign_id] = stats
+        
+        if max_urls is not None and len(grouped_alerts[group_key]["campaign_data"][campaign_id]) >= max_urls:
+            continue
+        if alert_details_url and alert_details_url not in grouped_alerts[group_key]["campaign_data"][campaign_id]:
+            grouped_alerts[group_key]["campaign_data"][campaign_id].append(alert_details_url)
+        elif not alert_details_url:
+            # Fallback to generic alert history URL if alert_details_url is not available
+            alert_id = alert.get("alert_id", "")
+            if alert_id:
+                geoedge_url = f"https://site.geoedge.com/analyticsv2/alertshistory/{alert_id}/1/off/"
+                if geoedge_url not in grouped_alerts[group_key]["campaign_data"][campaign_id]:
+                    grouped_alerts[group_key]["campaign_data"][campaign_id].append(geoedge_url)
+
+    return grouped_alerts
+
+
+def _group_region_alerts(region_alerts: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """group_alerts_for_report, sharded by account_id across SHARD_WORKERS processes on very large days."""
+    shard_workers = _shard_workers(len(region_alerts))
+    if shard_workers:
+        try:
+            return group_alerts_sharded(region_alerts, group_alerts_for_report, shard_workers)
+        except (OSError, BrokenProcessPool) as e:
+            log_message(f"⚠️ Sharded grouping failed ({e}) — grouping in-process", WARNING)
+    return group_alerts_for_report(region_alerts)
+
+
+REPORT_REGION_TYPES = ("LATAM", "Greater China")
+
+
+def _report_csv_filename() -> str:
+    return f"lp_alerts_report_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M')}.csv"
+
+
 def generate_alert_email_html(
     alerts: List[Dict[str, Any]],
     target_locations: Optional[set[str]] = None,
@@ -544,13 +1569,50 @@ def generate_alert_email_html(
 ) -> Tuple[str, Optional[str], Optional[str]]:
     """Generate HTML email content for alerts and CSV attachment data."""
 
+    # Group alerts by region
+    region_groups: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for region_type in REPORT_REGION_TYPES:
+        region_alerts = [alert for alert in alerts if alert.get("region_type") == region_type]
+        region_groups[region_type] = _group_region_alerts(region_alerts) if region_alerts else {}
+
+    return _render_report(region_groups, target_locations, target_label)
+
+
+def _render_report(
+    region_groups: Dict[str, Dict[str, Dict[str, Any]]],
+    target_locations: Optional[set[str]] = None,
+    target_label: Optional[str] = None,
+    max_table_rows: Optional[int] = None,
+) -> Tuple[str, Optional[str], Optional[str]]:
+    """render_alert_email into (html, CSV content, CSV filename); the CSV parts are None without rows."""
+    buffer = io.StringIO()
+    html_content, csv_rows = render_alert_email(
+        region_groups, target_locations, target_label, buffer, max_table_rows=max_table_rows
+    )
+    csv_content = buffer.getvalue() if csv_rows else None
+    buffer.close()
+    return html_content, csv_content, _report_csv_filename() if csv_rows else None
+
+
+def render_alert_email(
+    region_groups: Dict[str, Dict[str, Dict[str, Any]]],
+    target_locations: Optional[set[str]] = None,
+    target_label: Optional[str] = None,
+    csv_file: Optional[TextIO] = None,
+    max_table_rows: Optional[int] = None,
+) -> Tuple[str, int]:
+    """
+    Render the alert email HTML from grouped alerts ({region_type: group_alerts_for_report(...)}).
+    CSV report rows (with a header) are written to csv_file as the tables are built.
+    max_table_rows caps the rows of each region table; the rest are only in the CSV.
+    Returns (html, number of CSV rows written).
+    """
+
     target_locations = target_locations or TARGET_LOCATIONS
     target_label = target_label or "/".join(sorted(target_locations))
-    
-    # Group alerts by region
-    latam_alerts = [alert for alert in alerts if alert.get("region_type") == "LATAM"]
-    china_alerts = [alert for alert in alerts if alert.get("region_type") == "Greater China"]
-    rows_for_csv: List[Dict[str, Any]] = []
+    target_mask = country_mask(target_locations)
+    csv_writer = None
+    csv_rows = 0
     csv_headers = [
         "Status",
         "Region",
@@ -561,6 +1623,8 @@ def generate_alert_email_html(
         "Alert Link",
         "Target Locations",
         "Alert Type",
+        f"Frequency ({RECURRENCE_WINDOW_DAYS}d)",
+        "Streak (days)",
     ]
     
     def build_report_download_button(has_data: bool) -> str:
@@ -576,69 +1640,14 @@ def generate_alert_email_html(
             </div>
         """
     
-    def create_alert_table(region_alerts, region_name, icon):
-        if not region_alerts:
+    def create_alert_table(grouped_alerts, region_name, icon):
+        nonlocal csv_writer, csv_rows
+        if not grouped_alerts:
             return ""
-        
-        # Group alerts by account_id + trigger_type combination
-        grouped_alerts = {}
-        for alert in region_alerts:
-            account_id = alert.get("account_id", "Unknown")
-            account_name = alert.get("account_name", "Unknown")
-            publisher_country = alert.get("publisher_country", "Unknown")
-            campaign_locations = alert.get("campaign_locations", "Unknown")
-            
-            # Get proper trigger name
-            trigger_name = alert.get("trigger_type_name", "Unknown")
-            if trigger_name == "Unknown":
-                trigger_id = alert.get("trigger_type_id")
-                trigger_id_str = str(trigger_id) if trigger_id is not None else ""
-                if trigger_id_str == "25":
-                    trigger_name = "LP CHANGE"
-                elif trigger_id_str == "35":
-                    trigger_name = "CREATIVE CHANGE"
-                elif trigger_id_str == "32":
-                    trigger_name = "AUTO REDIRECT"
-            
-            recurrence_status = alert.get("recurrence_status", "NEW")
-
-            # Create unique key for grouping by account + alert type
-            group_key = f"{account_id}|{trigger_name}|{publisher_country}|{campaign_locations}"
-
-            if group_key not in grouped_alerts:
-                grouped_alerts[group_key] = {
-                    "account_id": account_id,
-                    "account_name": account_name,
-                    "publisher_country": publisher_country,
-                    "campaign_locations": campaign_locations,
-                    "trigger_name": trigger_name,
-                    "campaign_data": {},  # Store campaign_id -> list of alert_details_urls mapping
-                    "recurrence_status": recurrence_status,
-                }
-            elif recurrence_status == "NEW":
-                # Promote group to NEW if any alert in it is new
-                grouped_alerts[group_key]["recurrence_status"] = "NEW"
-            
-            # Add campaign ID and its alert URL to the group
-            campaign_id = alert.get("campaign_id", "Unknown")
-            alert_details_url = alert.get("alert_details_url", "")
-            
-            # Store all alert_details_urls for this campaign (list of URLs)
-            if campaign_id not in grouped_alerts[group_key]["campaign_data"]:
-                grouped_alerts[group_key]["campaign_data"][campaign_id] = []
-            
-            if alert_details_url and alert_details_url not in grouped_alerts[group_key]["campaign_data"][campaign_id]:
-                grouped_alerts[group_key]["campaign_data"][campaign_id].append(alert_details_url)
-            elif not alert_details_url:
-                # Fallback to generic alert history URL if alert_details_url is not available
-                alert_id = alert.get("alert_id", "")
-                if alert_id:
-                    geoedge_url = f"https://site.geoedge.com/analyticsv2/alertshistory/{alert_id}/1/off/"
-                    if geoedge_url not in grouped_alerts[group_key]["campaign_data"][campaign_id]:
-                        grouped_alerts[group_key]["campaign_data"][campaign_id].append(geoedge_url)
-        
+
         # Generate rows from grouped data
         rows = ""
+        table_rows = 0
         for group_data in grouped_alerts.values():
             account_id = group_data["account_id"]
             account_name = group_data.get("account_name", "Unknown")
@@ -647,11 +1656,9 @@ def generate_alert_email_html(
             
             # Filter campaign locations to show only our focus countries for this flow
             if campaign_locations:
-                # Handle both comma-separated formats: "US,CA,GB,DE" and "US, CA, GB, DE"
-                all_locations = set(loc.strip() for loc in campaign_locations.replace(" ", "").split(","))
-                focus_locations = all_locations.intersection(target_locations)
                 # Always show only our focus countries, never show DE or other countries
-                campaign_locations_filtered = ", ".join(sorted(focus_locations)) if focus_locations else "N/A"
+                focus_locations = mask_codes(locations_mask(campaign_locations) & target_mask)
+                campaign_locations_filtered = ", ".join(focus_locations) if focus_locations else "N/A"
             else:
                 campaign_locations_filtered = "N/A"
             
@@ -669,20 +1676,34 @@ def generate_alert_email_html(
                 else:
                     link_cell = "N/A"
 
-                status_cell = f'<span style="background:{status_bg};color:{status_color};padding:2px 6px;border-radius:3px;font-size:11px;font-weight:bold;">{recurrence_status}</span>'
+                frequency, streak = group_data["campaign_stats"].get(campaign_id, (None, None))
+                frequency_cell = f"{frequency}× / {RECURRENCE_WINDOW_DAYS}d" if frequency is not None else "N/A"
+                streak_cell = f"{streak}d" if streak is not None else "N/A"
 
-                rows_for_csv.append({
-                    "Region": region_name,
-                    "Account ID": account_id,
-                    "Account Name": account_name,
-                    "Publisher Country": publisher_country,
-                    "Campaign ID": campaign_id,
-                    "Alert Link": primary_url,
-                    "Target Locations": campaign_locations_filtered,
-                    "Alert Type": trigger_name,
-                    "Status": recurrence_status,
-                })
+                status_cell = f'<span style="background:{status_bg};color:{status_color};padding:2px 6px;border-radius:3px;font-size:11px;font-weight:bold;">{recurrence_status}</span>'
 
+                if csv_file is not None:
+                    if csv_writer is None:
+                        csv_writer = csv.DictWriter(csv_file, fieldnames=csv_headers)
+                        csv_writer.writeheader()
+                    csv_writer.writerow({
+                        "Region": region_name,
+                        "Account ID": account_id,
+                        "Account Name": account_name,
+                        "Publisher Country": publisher_country,
+                        "Campaign ID": campaign_id,
+                        "Alert Link": primary_url,
+                        "Target Locations": campaign_locations_filtered,
+                        "Alert Type": trigger_name,
+                        "Status": recurrence_status,
+                        f"Frequency ({RECURRENCE_WINDOW_DAYS}d)": "" if frequency is None else frequency,
+                        "Streak (days)": "" if streak is None else streak,
+                    })
+                    csv_rows += 1
+
+                table_rows += 1
+                if max_table_rows is not None and table_rows > max_table_rows:
+                    continue
                 rows += f"""
                 <tr>
                     <td style="padding: 8px; border: 1px solid #ddd;">{status_cell}</td>
@@ -693,6 +1714,15 @@ def generate_alert_email_html(
                     <td style="padding: 8px; border: 1px solid #ddd;">{link_cell}</td>
                     <td style="padding: 8px; border: 1px solid #ddd;">{campaign_locations_filtered}</td>
                     <td style="padding: 8px; border: 1px solid #ddd;">{trigger_name}</td>
+                    <td style="padding: 8px; border: 1px solid #ddd;">{frequency_cell}</td>
+                    <td style="padding: 8px; border: 1px solid #ddd;">{streak_cell}</td>
+                </tr>
+                """
+
+        if max_table_rows is not None and table_rows > max_table_rows:
+            rows += f"""
+                <tr>
+                    <td colspan="10" style="padding: 8px; border: 1px solid #ddd; color: #666;">… {table_rows - max_table_rows} more rows in the attached CSV report</td>
                 </tr>
                 """
         
@@ -712,6 +1742,8 @@ def generate_alert_email_html(
                         <th style="padding: 10px; border: 1px solid #ddd;">Link</th>
                         <th style="padding: 10px; border: 1px solid #ddd;">Target Locations</th>
                         <th style="padding: 10px; border: 1px solid #ddd;">Alert Type</th>
+                        <th style="padding: 10px; border: 1px solid #ddd;">Frequency</th>
+                        <th style="padding: 10px; border: 1px solid #ddd;">Streak</th>
                     </tr>
                 </thead>
                 <tbody>
@@ -721,21 +1753,10 @@ def generate_alert_email_html(
         </div>
         """
     
-    latam_table = create_alert_table(latam_alerts, "LATAM Accounts", "🌎")
-    china_table = create_alert_table(china_alerts, "Greater China Accounts", "🔴")
-
-    csv_content: Optional[str] = None
-    csv_filename: Optional[str] = None
-    if rows_for_csv:
-        buffer = io.StringIO()
-        writer = csv.DictWriter(buffer, fieldnames=csv_headers)
-        writer.writeheader()
-        writer.writerows(rows_for_csv)
-        csv_content = buffer.getvalue()
-        buffer.close()
-        csv_filename = f"lp_alerts_report_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M')}.csv"
-    
-    download_button_html = build_report_download_button(bool(rows_for_csv))
+    latam_table = create_alert_table(region_groups.get("LATAM"), "LATAM Accounts", "🌎")
+    china_table = create_alert_table(region_groups.get("Greater China"), "Greater China Accounts", "🔴")
+
+    download_button_html = build_report_download_button(bool(csv_rows))
     
     html_content = f"""
     <html>
@@ -756,7 +1777,7 @@ def generate_alert_email_html(
     </html>
     """
     
-    return html_content, csv_content, csv_filename
+    return html_content, csv_rows
 
 
 def generate_no_alerts_email_html(target_label: Optional[str] = None) -> str:
@@ -786,6 +1807,106 @@ def generate_no_alerts_email_html(target_label: Optional[str] = None) -> str:
     """
 
 
+_ALERT_HISTORY_LOCK = threading.Lock()
+_HISTORY_MIGRATED = False
+
+
+def _migrate_json_history(store: AlertStore) -> None:
+    """One-time import of alert_history.json into the alert store; the file is kept as *.migrated."""
+    global _HISTORY_MIGRATED
+    if _HISTORY_MIGRATED:
+        return
+    _HISTORY_MIGRATED = True
+    if not os.path.exists(ALERT_HISTORY_FILE):
+        return
+    history = load_alert_history()
+    imported = store.record_history({key: {"last_seen": last_seen} for key, last_seen in history.items()}, keep_newer=True)
+    os.replace(ALERT_HISTORY_FILE, f"{ALERT_HISTORY_FILE}.migrated")
+    log_message(f"🗃️ Migrated {imported} alert history entries from {ALERT_HISTORY_FILE} to the alert store")
+
+
+def _history_key(alert: Dict[str, Any]) -> str:
+    return f"{alert.get('campaign_id')}|{alert.get('trigger_type_name', '')}"
+
+
+def _apply_recurrence(
+    alerts: List[Dict[str, Any]],
+    history: Dict[str, str],
+    now: datetime,
+    rings: Optional[Dict[str, DayRing]] = None,
+) -> None:
+    """
+    Set recurrence_status on each alert from history ({key: last_seen ISO}, updated in place).
+    With rings ({key: DayRing}, already counted), also set recurrence_frequency / recurrence_streak.
+    """
+    now_iso = now.isoformat()
+    today = now.date()
+    today_day = epoch_day(today)
+    recurring_since = now - timedelta(days=ALERT_HISTORY_DAYS)
+    for alert in alerts:
+        key = _history_key(alert)
+        if key in history:
+            last_seen = datetime.fromisoformat(history[key])
+            # Only RECURRING if seen on a previous calendar day within ALERT_HISTORY_DAYS.
+            # Same-day entries (duplicates or cross-flow in same run) stay NEW.
+            if last_seen.date() < today and last_seen >= recurring_since:
+                days_ago = (today - last_seen.date()).days
+                alert["recurrence_status"] = f"RECURRING (last seen {days_ago}d ago)"
+            else:
+                alert["recurrence_status"] = "NEW"
+        else:
+            alert["recurrence_status"] = "NEW"
+        history[key] = now_iso
+
+        if rings is not None:
+            ring = rings[key]
+            alert["recurrence_frequency"] = ring.total(today_day)
+            alert["recurrence_streak"] = ring.streak(today_day)
+
+
+def _recurrence_events(alerts: List[Dict[str, Any]], now: datetime) -> Dict[str, Dict[str, int]]:
+    """
+    {history key: {event key: event epoch day}} for the alerts. Alerts matching several campaign
+    rows share an event key, so each event appears once per key.
+    """
+    now_ts = int(now.timestamp())
+    events: Dict[str, Dict[str, int]] = {}
+    for alert in alerts:
+        event_ts = _parse_event_timestamp(alert.get("event_datetime")) or now_ts
+        event_day = epoch_day(datetime.fromtimestamp(event_ts, timezone.utc).date())
+        events.setdefault(_history_key(alert), {})[_alert_event_key(alert)] = event_day
+    return events
+
+
+def tag_recurrence(alerts: List[Dict[str, Any]]) -> None:
+    """
+    Set recurrence_status (NEW / RECURRING) on each alert from the alert history and record them.
+    History lives in the alert store (per-key lookups and upserts in one transaction, expiry pruned
+    via an index), together with a RECURRENCE_WINDOW_DAYS day-bucket counter per key that gives each
+    alert its frequency and streak. Each event is counted once per key, on its event day, however
+    many flows or reruns see it. alert_history.json is only used if the store can't be opened.
+    """
+    now = datetime.now(timezone.utc)
+    store = get_alert_store()
+    with _ALERT_HISTORY_LOCK:
+        if store is None:
+            history = load_alert_history()
+            _apply_recurrence(alerts, history, now)
+            save_alert_history(history)
+            return
+
+        try:
+            _migrate_json_history(store)
+            history, rings = store.count_recurrence(
+                _recurrence_events(alerts, now), now.isoformat(), RECURRENCE_WINDOW_DAYS, epoch_day(now.date())
+            )
+            _apply_recurrence(alerts, history, now, rings)
+            retention_days = max(ALERT_HISTORY_DAYS, RECURRENCE_WINDOW_DAYS)
+            store.prune_history(int((now - timedelta(days=retention_days)).timestamp()))
+        except Exception as e:
+            log_message(f"⚠️ Could not update alert history: {e}", WARNING)
+
+
 def _format_target_label(target_locations: set[str]) -> str:
     return "/".join(sorted(target_locations))
 
@@ -803,6 +1924,184 @@ def _parse_recipients(env_var: str, fallback_env_var: Optional[str] = None) -> L
     return [r.strip() for r in raw.split(",") if r.strip()]
 
 
+def _stream_chunk_size() -> int:
+    """Alerts per streaming chunk for STREAM_MEMORY_BUDGET_MB."""
+    return max(1, STREAM_MEMORY_BUDGET_MB * 1024 * 1024 // 2 // STREAM_ALERT_BYTES)
+
+
+def _iter_chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _store_enriched_alerts(flow_name: str, alerts: List[Dict[str, Any]]) -> None:
+    """Keep enriched alerts on local disk for reprocessing, previews and reporting."""
+    store = get_alert_store()
+    if store is None or not alerts:
+        return
+    now_ts = int(datetime.now(timezone.utc).timestamp())
+    try:
+        with record_span("store"):
+            store.upsert_enriched_alerts(
+                flow_name,
+                (
+                    {
+                        "event_key": _alert_event_key(alert),
+                        "event_ts": _parse_event_timestamp(alert.get("event_datetime")) or now_ts,
+                        "alert": dict(alert),
+                    }
+                    for alert in alerts
+                ),
+            )
+    except Exception as e:
+        log_message(f"⚠️ [{flow_name}] Could not store enriched alerts: {e}", WARNING)
+
+
+class _StreamMatcher:
+    """
+    Streaming mode's filter → enrich → match step, one chunk at a time. Each project's rows and each
+    campaign's status are looked up once per flow, however many chunks mention them, over one Vertica
+    executor; counters add up across chunks and log_summary() logs them once for the flow.
+    Create it on the flow's thread (see _ActiveCampaignPipeline).
+    """
+
+    def __init__(self, target_countries: set[str], vertica_executor: Optional[ThreadPoolExecutor] = None):
+        self.target_countries = target_countries
+        self._vertica_executor = vertica_executor
+        self._project_data: Dict[str, List[Dict[str, Any]]] = {}
+        self._looked_up_projects: set = set()
+        self._checked_campaigns: set = set()
+        self._active_campaign_ids: set = set()
+        self.alerts_in = 0
+        self.filtered = 0
+        self.matched = 0
+        self._skipped_inactive = 0
+        self._skipped_off_target = 0
+        self._missing_project_data = 0
+        self._project_cache_hits = 0
+        self._mysql_rows: Optional[int] = None
+        self._campaign_cache_hits = 0
+
+    def match(self, alerts: List[Dict[str, Any]]) -> List[AlertRecord]:
+        """Matches for one chunk; an enrichment failure is logged and drops the chunk."""
+        self.alerts_in += len(alerts)
+        record_count("alerts_in", len(alerts))
+        filtered_alerts = _filter_target_alerts(alerts, self.target_countries)
+        if not filtered_alerts:
+            return []
+        try:
+            with record_span("enrich"):
+                self._enrich({alert["project_id"] for alert in filtered_alerts} - self._looked_up_projects)
+        except MySQLError as e:
+            log_message(f"❌ Database error: {str(e)}", ERROR)
+            return []
+        except Exception as e:
+            log_message(f"❌ Error in batch query: {str(e)}", ERROR)
+            return []
+
+        matches, skipped_inactive, skipped_off_target, missing_project_data = _match_alerts(
+            filtered_alerts, self._project_data, self._active_campaign_ids, self.target_countries
+        )
+        self.filtered += len(filtered_alerts)
+        self.matched += len(matches)
+        self._skipped_inactive += skipped_inactive
+        self._skipped_off_target += skipped_off_target
+        self._missing_project_data += missing_project_data
+        return matches
+
+    def _enrich(self, project_ids: set) -> None:
+        """Load rows for projects not seen yet in this flow and check their new campaigns."""
+        if not project_ids:
+            return
+        project_ids = list(project_ids)
+        if self._vertica_executor is not None:
+            # Pipelined: status batches go to Vertica while MySQL rows are still streaming
+            checked_campaigns = set(self._checked_campaigns)  # kept only if the whole lookup succeeds
+            status_pipeline = _ActiveCampaignPipeline(
+                self._vertica_executor, VERTICA_IN_CHUNK_SIZE, seen=checked_campaigns
+            )
+            project_data, cache_hits, mysql_rows = _load_project_data(project_ids, on_rows=status_pipeline.add_rows)
+            active_ids, campaign_cache_hits = status_pipeline.collect()
+            self._checked_campaigns = checked_campaigns
+        else:
+            project_data, cache_hits, mysql_rows = _load_project_data(project_ids)
+            new_campaign_ids = list(
+                {row["campaign_id"] for rows in project_data.values() for row in rows} - self._checked_campaigns
+            )
+            active_ids, campaign_cache_hits = (
+                _check_campaign_statuses(new_campaign_ids) if new_campaign_ids else (set(), 0)
+            )
+            self._checked_campaigns.update(new_campaign_ids)
+        self._looked_up_projects.update(project_ids)
+        self._project_data.update(project_data)
+        self._active_campaign_ids |= active_ids
+        self._project_cache_hits += cache_hits
+        if mysql_rows is not None:
+            self._mysql_rows = (self._mysql_rows or 0) + mysql_rows
+        self._campaign_cache_hits += campaign_cache_hits
+
+    def log_summary(self) -> None:
+        """The per-flow INFO lines process_alerts_to_target_regions logs, over every chunk."""
+        target_label = ", ".join(sorted(self.target_countries))
+        log_message(
+            f"🏢 Processed {self.alerts_in} alerts to find LATAM/Greater China publishers targeting {target_label}"
+        )
+        log_message(f"📊 Filtered to {self.filtered} alerts from target locations ({target_label})")
+        if not self._looked_up_projects:
+            return
+        log_message(f"🔍 Queried database for {len(self._looked_up_projects)} unique projects")
+        _log_project_lookups(len(self._looked_up_projects), self._project_cache_hits, self._mysql_rows)
+        if self._checked_campaigns:
+            _log_campaign_statuses(self._checked_campaigns, self._active_campaign_ids, self._campaign_cache_hits)
+        _log_match_summary(
+            self.filtered,
+            self.matched,
+            self._skipped_inactive,
+            self._skipped_off_target,
+            self._missing_project_data,
+            self.target_countries,
+        )
+
+
+def _stream_alert_flow(
+    flow_name: str,
+    alerts: Iterable[Dict[str, Any]],
+    target_locations: set[str],
+) -> Tuple[int, int, Dict[str, Dict[str, Dict[str, Any]]]]:
+    """
+    Streaming mode: filter → enrich → match → tag → store → group one chunk of alerts at a time.
+    Only the report groups (first alert URL per campaign, as rendered) and the flow's project rows
+    and campaign statuses (see _StreamMatcher) outlive a chunk; match counters are logged once.
+    Returns (alerts read, matched alert count, {region_type: groups}).
+    """
+    chunk_size = _stream_chunk_size()
+    region_groups: Dict[str, Dict[str, Dict[str, Any]]] = {region_type: {} for region_type in REPORT_REGION_TYPES}
+    vertica_executor = ThreadPoolExecutor(max_workers=VERTICA_POOL_SIZE) if PIPELINED_STAGES else None
+    matcher = _StreamMatcher(target_locations, vertica_executor)
+    try:
+        for chunk in _iter_chunks(alerts, chunk_size):
+            with record_span("process"):
+                matches = matcher.match(chunk)
+            if not matches:
+                continue
+            with record_span("tag"):
+                tag_recurrence(matches)
+            _store_enriched_alerts(flow_name, matches)
+            with record_span("group"):
+                for region_type, groups in region_groups.items():
+                    region_alerts = [alert for alert in matches if alert.get("region_type") == region_type]
+                    group_alerts_for_report(region_alerts, grouped_alerts=groups, max_urls=1)
+    finally:
+        if vertica_executor is not None:
+            vertica_executor.shutdown()
+    matcher.log_summary()
+    return matcher.alerts_in, matcher.matched, region_groups
+
+
 def _run_alert_flow(
     flow_name: str,
     target_locations: set[str],
@@ -810,105 +2109,295 @@ def _run_alert_flow(
     recipients_env: str,
     cc_env: str,
     fallback_recipients_env: Optional[str] = None,
+    alerts: Optional[Iterable[Dict[str, Any]]] = None,
 ) -> None:
-    """Execute full fetch→process→email flow for a target set."""
+    """
+    Execute full fetch→process→email flow for a target set.
+    Pass pre-fetched alerts (see _fetch_alerts_for_flows) to skip the per-flow GeoEdge fetch;
+    in streaming mode they can be any iterable and are only read once, chunk by chunk.
+    """
 
-    try:
-        log_message("=" * 80)
-        log_message(f"🎯 [{flow_name}] GEOEDGE LP ALERTS CHECKER")
-        log_message("=" * 80)
+    with flow_metrics(flow_name) as metrics:
+        try:
+            log_message("=" * 80)
+            log_message(f"🎯 [{flow_name}] GEOEDGE LP ALERTS CHECKER")
+            log_message("=" * 80)
 
-        target_csv = _format_target_csv(target_locations)
-        target_label = _format_target_label(target_locations)
+            target_csv = _format_target_csv(target_locations)
+            target_label = _format_target_label(target_locations)
 
-        # Step 1: Fetch alerts from GeoEdge API
-        alerts = fetch_alerts_from_geoedge(target_csv, flow_name)
+            # Step 1: Fetch alerts from GeoEdge API (unless the run planner already did)
+            if alerts is None:
+                with record_span("fetch"):
+                    alerts = fetch_alerts_from_geoedge(target_csv, flow_name, stream=STREAMING_PIPELINE)
 
-        if not alerts:
-            log_message("⚠️ No alerts found from API")
-            filtered_alerts = []
-        else:
-            log_message(f"✅ Found {len(alerts)} alerts from API")
+            region_groups = None
+            if STREAMING_PIPELINE:
+                log_message(f"🌊 Streaming alerts in chunks of {_stream_chunk_size()}")
+                filtered_alerts = []
+                alerts_in, matched_count, region_groups = _stream_alert_flow(flow_name, alerts, target_locations)
+                if not alerts_in:
+                    log_message("⚠️ No alerts found from API", WARNING)
+                elif not matched_count:
+                    log_message("⚠️ No alerts match target regions (LATAM + Greater China)", WARNING)
+            elif not alerts:
+                log_message("⚠️ No alerts found from API", WARNING)
+                filtered_alerts = []
+            else:
+                log_message(f"✅ Found {len(alerts)} alerts from API")
+
+                # Step 2: Process alerts to find target regions
+                with record_span("process"):
+                    filtered_alerts = process_alerts_to_target_regions(alerts, target_locations)
+
+                if not filtered_alerts:
+                    log_message("⚠️ No alerts match target regions (LATAM + Greater China)", WARNING)
+                    filtered_alerts = []
+
+            # Tag each alert as NEW or RECURRING based on history (streaming mode already did, per chunk)
+            if region_groups is None:
+                with record_span("tag"):
+                    tag_recurrence(filtered_alerts)
+                _store_enriched_alerts(flow_name, filtered_alerts)
+                matched_count = len(filtered_alerts)
+
+            # Step 3: Send email (even if no alerts)
+            recipient_list = _parse_recipients(recipients_env, fallback_recipients_env)
+            if not recipient_list:
+                log_message(f"⚠️ No {recipients_env} configured in .env", WARNING)
+                return
+
+            cc_list = _parse_recipients(cc_env)
+
+            log_message(f"📧 [{flow_name}] Sending email to: {', '.join(recipient_list)}")
+            if cc_list:
+                log_message(f"📧 [{flow_name}] CC: {', '.join(cc_list)}")
+            log_message(f"📧 [{flow_name}] Subject: {email_subject}")
+
+            if send_alert_email(
+                recipient_list,
+                filtered_alerts,
+                target_locations,
+                target_label,
+                cc_recipients=cc_list,
+                subject=email_subject,
+                region_groups=region_groups,
+            ):
+                log_message(
+                    f"✅ [{flow_name}] Alert check complete: {matched_count} alerts sent to {len(recipient_list)} recipients"
+                )
+            else:
+                log_message(f"❌ [{flow_name}] Failed to send email", ERROR)
 
-            # Step 2: Process alerts to find target regions
-            filtered_alerts = process_alerts_to_target_regions(alerts, target_locations)
+        except Exception as e:
+            log_message(f"❌ [{flow_name}] Error: {str(e)}", ERROR)
+        finally:
+            log_message(f"⏱️ [{flow_name}] Stage timings: {metrics.summary() or 'n/a'}")
+
+
+ALERT_FLOWS: List[Dict[str, Any]] = [
+    {
+        "flow_name": "Primary US/GB/CA/AU",
+        "target_locations": TARGET_LOCATIONS,
+        "email_subject": EMAIL_SETTINGS["subject"],
+        "recipients_env": "RECIPIENTS_PRIMARY",
+        "cc_env": "CC_RECIPIENTS_PRIMARY",
+        "fallback_recipients_env": "RECIPIENTS",
+    },
+    {
+        "flow_name": "ES/IT",
+        "target_locations": TARGET_LOCATIONS_ESIT,
+        "email_subject": EMAIL_SETTINGS.get("subject_esit", "🚨 LP/Creative/Auto-Redirect Alerts - LATAM & Greater China Publishers → ES/IT Campaigns"),
+        "recipients_env": "RECIPIENTS_ESIT",
+        "cc_env": "CC_RECIPIENTS_ESIT",
+        "fallback_recipients_env": "RECIPIENTS",
+    },
+]
+
+
+def _partition_alerts_by_flow(
+    alerts: List[Dict[str, Any]],
+    flows: List[Dict[str, Any]],
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Split one shared alert list into per-flow lists by each flow's target countries."""
 
-            if not filtered_alerts:
-                log_message("⚠️ No alerts match target regions (LATAM + Greater China)")
-                filtered_alerts = []
+    partitions: Dict[str, List[Dict[str, Any]]] = {flow["flow_name"]: [] for flow in flows}
+    for alert in alerts:
+        location_codes = (alert.get("location") or {}).keys()
+        for flow in flows:
+            if any(code in flow["target_locations"] for code in location_codes):
+                partitions[flow["flow_name"]].append(alert)
+    return partitions
 
-        # Tag each alert as NEW or RECURRING based on history
-        history = load_alert_history()
-        now = datetime.now(timezone.utc)
-        now_iso = now.isoformat()
-        today = now.date()
-        for alert in filtered_alerts:
-            key = f"{alert.get('campaign_id')}|{alert.get('trigger_type_name', '')}"
-            if key in history:
-                last_seen = datetime.fromisoformat(history[key])
-                # Only RECURRING if seen on a previous calendar day.
-                # Same-day entries (duplicates or cross-flow in same run) stay NEW.
-                if last_seen.date() < today:
-                    days_ago = (today - last_seen.date()).days
-                    alert["recurrence_status"] = f"RECURRING (last seen {days_ago}d ago)"
-                else:
-                    alert["recurrence_status"] = "NEW"
-            else:
-                alert["recurrence_status"] = "NEW"
-            history[key] = now_iso
-        save_alert_history(history)
 
-        # Step 3: Send email (even if no alerts)
-        recipient_list = _parse_recipients(recipients_env, fallback_recipients_env)
-        if not recipient_list:
-            log_message(f"⚠️ No {recipients_env} configured in .env")
-            return
+def _flow_alert_stream(alerts: Iterable[Dict[str, Any]], target_locations: set[str]) -> Iterable[Dict[str, Any]]:
+    """Streaming mode's lazy _partition_alerts_by_flow: one flow's alerts, filtered as they are read."""
+    if isinstance(alerts, _RawAlertWindow):
+        return alerts.for_locations(target_locations)
+    if not alerts:
+        return []
+    return (
+        alert for alert in alerts if any(code in target_locations for code in (alert.get("location") or {}).keys())
+    )
+
+
+def _fetch_alerts_for_flows(
+    flows: List[Dict[str, Any]],
+    shard_hours: Optional[float] = None,
+) -> Optional[Dict[str, Iterable[Dict[str, Any]]]]:
+    """
+    Run planner: fetch once for the union of all flows' target countries,
+    then fan the alerts out locally per flow. Returns None if the fetch failed.
+    In streaming mode each flow gets a lazy view instead of its own list (see _flow_alert_stream).
+    """
 
-        cc_list = _parse_recipients(cc_env)
-
-        log_message(f"📧 [{flow_name}] Sending email to: {', '.join(recipient_list)}")
-        if cc_list:
-            log_message(f"📧 [{flow_name}] CC: {', '.join(cc_list)}")
-        log_message(f"📧 [{flow_name}] Subject: {email_subject}")
-
-        if send_alert_email(
-            recipient_list,
-            filtered_alerts,
-            target_locations,
-            target_label,
-            cc_recipients=cc_list,
-            subject=email_subject,
-        ):
-            log_message(
-                f"✅ [{flow_name}] Alert check complete: {len(filtered_alerts)} alerts sent to {len(recipient_list)} recipients"
+    union_locations: set[str] = set()
+    for flow in flows:
+        union_locations |= flow["target_locations"]
+
+    with flow_metrics("All flows"), record_span("fetch"):
+        try:
+            alerts = fetch_alerts_from_geoedge(
+                _format_target_csv(union_locations), "All flows", shard_hours=shard_hours, stream=STREAMING_PIPELINE
             )
-        else:
-            log_message(f"❌ [{flow_name}] Failed to send email")
+        except Exception as e:
+            log_message(f"❌ [All flows] Shared fetch error: {str(e)}", ERROR)
+            return None
 
-    except Exception as e:
-        log_message(f"❌ [{flow_name}] Error: {str(e)}")
+    if STREAMING_PIPELINE:
+        return {flow["flow_name"]: _flow_alert_stream(alerts, flow["target_locations"]) for flow in flows}
 
+    partitions = _partition_alerts_by_flow(alerts, flows)
+    for flow_name, flow_alerts in partitions.items():
+        log_message(f"🔀 [{flow_name}] {len(flow_alerts)}/{len(alerts)} shared alerts match this flow's targets")
+    return partitions
 
-def main():
-    """Run primary (US/GB/CA/AU) and ES/IT flows with per-flow recipients."""
 
-    _run_alert_flow(
-        flow_name="Primary US/GB/CA/AU",
-        target_locations=TARGET_LOCATIONS,
-        email_subject=EMAIL_SETTINGS["subject"],
-        recipients_env="RECIPIENTS_PRIMARY",
-        cc_env="CC_RECIPIENTS_PRIMARY",
-        fallback_recipients_env="RECIPIENTS",
+def _run_flows(
+    flows: List[Dict[str, Any]],
+    partitions: Dict[str, Iterable[Dict[str, Any]]],
+    max_workers: Optional[int] = None,
+) -> None:
+    """
+    Run each flow on its pre-fetched alerts, up to max_workers (default FLOW_WORKERS) at a time.
+    Concurrent flows buffer their log lines so each flow's log stays one contiguous block.
+    """
+
+    max_workers = FLOW_WORKERS if max_workers is None else max_workers
+    workers = min(max_workers, len(flows))
+    if workers <= 1:
+        for flow in flows:
+            _run_alert_flow(**flow, alerts=partitions[flow["flow_name"]])
+        return
+
+    def run_flow(flow: Dict[str, Any]) -> None:
+        with buffered_flow_log():
+            _run_alert_flow(**flow, alerts=partitions[flow["flow_name"]])
+
+    log_message(f"⚡ Running {len(flows)} flows concurrently ({workers} workers)")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for future in [executor.submit(run_flow, flow) for flow in flows]:
+            future.result()
+    log_message(f"⏱️ All flows finished in {time.perf_counter() - started:.2f}s")
+
+
+def run_backfill(
+    since: datetime,
+    until: Optional[datetime] = None,
+    shard_hours: Optional[float] = None,
+    flows: Optional[List[Dict[str, Any]]] = None,
+) -> int:
+    """
+    Backfill the local alert store for [since, until] over all flows' target countries,
+    using the sharded parallel fetch. No emails are sent. Returns the number of alerts fetched.
+    """
+
+    flows = flows or ALERT_FLOWS
+    union_locations: set[str] = set()
+    for flow in flows:
+        union_locations |= flow["target_locations"]
+
+    alerts = fetch_alerts_from_geoedge(
+        _format_target_csv(union_locations),
+        "Backfill",
+        since=since,
+        until=until or datetime.now(timezone.utc),
+        shard_hours=shard_hours,
     )
+    log_message(f"✅ [Backfill] Stored {len(alerts)} alerts in the local alert store")
+    return len(alerts)
 
-    _run_alert_flow(
-        flow_name="ES/IT",
-        target_locations=TARGET_LOCATIONS_ESIT,
-        email_subject=EMAIL_SETTINGS.get("subject_esit", "🚨 LP/Creative/Auto-Redirect Alerts - LATAM & Greater China Publishers → ES/IT Campaigns"),
-        recipients_env="RECIPIENTS_ESIT",
-        cc_env="CC_RECIPIENTS_ESIT",
-        fallback_recipients_env="RECIPIENTS",
+
+def _parse_cli_datetime(value: str) -> datetime:
+    """Parse a UTC --since/--until value ("YYYY-MM-DD", "YYYY-MM-DD HH:MM" or ISO 8601)."""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid date/time: {value!r}")
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _run_main(args: argparse.Namespace) -> None:
+    """Body of main() once arguments are parsed; main() wraps it in a log-index run."""
+    if args.invalidate_project:
+        store = get_alert_store()
+        if store is not None:
+            project_ids = None if "all" in args.invalidate_project else args.invalidate_project
+            removed = store.invalidate_projects(project_ids)
+            log_message(f"🗃️ Project cache: invalidated {removed} cached projects")
+
+    if args.since:
+        run_backfill(args.since, args.until, args.shard_hours)
+        return
+
+    partitions = _fetch_alerts_for_flows(ALERT_FLOWS, shard_hours=args.shard_hours)
+    if partitions is None:
+        return
+
+    # Open backend connections while the flows filter their alerts; no alerts, no DB work
+    warmup = start_db_pool_warmup() if any(partitions.values()) else None
+    try:
+        _run_flows(ALERT_FLOWS, partitions)
+    finally:
+        join_db_pool_warmup(warmup)
+        close_db_pools()
+
+
+def main(argv: Optional[List[str]] = None):
+    """Run primary (US/GB/CA/AU) and ES/IT flows with per-flow recipients, or a --since/--until backfill."""
+
+    parser = argparse.ArgumentParser(description="GeoEdge LP alerts checker")
+    parser.add_argument("--since", type=_parse_cli_datetime, help="Backfill start, UTC (e.g. 2026-01-01 or '2026-01-01 06:00')")
+    parser.add_argument("--until", type=_parse_cli_datetime, help="Backfill end, UTC (default: now)")
+    parser.add_argument("--shard-hours", type=float, help="Fetch window shard size in hours (default from config)")
+    parser.add_argument(
+        "--invalidate-project",
+        action="append",
+        metavar="PROJECT_ID",
+        help="Drop cached MySQL rows for a project before running (repeatable; 'all' clears the project cache)",
     )
+    parser.add_argument(
+        "--log-level",
+        choices=sorted(LOG_LEVELS, key=LOG_LEVELS.get),
+        type=str.upper,
+        help=f"Minimum log level (default {LOG_LEVEL}; DEBUG adds per-alert match/skip lines)",
+    )
+    args = parser.parse_args(argv)
+    if args.until and not args.since:
+        parser.error("--until requires --since")
+    if args.since and args.since >= (args.until or datetime.now(timezone.utc)):
+        parser.error("--since must be earlier than --until (or now)")
+    if args.log_level:
+        set_log_level(args.log_level)
+
+    run_id = start_run_log()
+    set_run_id(run_id)
+    try:
+        _run_main(args)
+    finally:
+        end_run_log(run_id)
+        flush_logs()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,79 @@
+"""
+Fixed-size day-bucket ring counters for alert recurrence.
+Each campaign|trigger key keeps one counter per day over a rolling window; adding an
+alert and reading the window total or current streak never touch more than `window`
+buckets, and the ring serializes to 2 bytes per day for the alert store.
+"""
+
+from array import array
+from datetime import date
+from typing import Optional
+
+_MAX_COUNT = 0xFFFF  # buckets are unsigned 16-bit and saturate
+
+
+def epoch_day(day: date) -> int:
+    """Days since 1970-01-01 for a (UTC) calendar date."""
+    return day.toordinal() - date(1970, 1, 1).toordinal()
+
+
+class DayRing:
+    """Alert counts for the last `window` days, bucketed by epoch day modulo window."""
+
+    __slots__ = ("window", "counts", "last_day")
+
+    def __init__(self, window: int, counts: Optional[bytes] = None, last_day: Optional[int] = None):
+        self.window = max(window, 1)
+        self.counts = array("H", bytes(2 * self.window))
+        self.last_day = None
+        if counts and last_day is not None:
+            stored = array("H")
+            stored.frombytes(counts)
+            if len(stored) == self.window:
+                self.counts = stored
+                self.last_day = last_day
+            # A ring saved with a different window size is dropped rather than misread
+
+    def to_bytes(self) -> bytes:
+        return self.counts.tobytes()
+
+    def _advance(self, day: int) -> None:
+        """Move the ring forward to `day`, zeroing buckets for the days skipped since last_day."""
+        if self.last_day is None or day - self.last_day >= self.window:
+            self.counts = array("H", bytes(2 * self.window))
+        elif day > self.last_day:
+            for skipped in range(self.last_day + 1, day + 1):
+                self.counts[skipped % self.window] = 0
+        if self.last_day is None or day > self.last_day:
+            self.last_day = day
+
+    def add(self, day: int, amount: int = 1) -> None:
+        """Count `amount` alerts on `day` (days older than the window are ignored)."""
+        self._advance(day)
+        if day <= self.last_day - self.window:
+            return
+        index = day % self.window
+        self.counts[index] = min(self.counts[index] + amount, _MAX_COUNT)
+
+    def count_on(self, day: int, today: int) -> int:
+        """Alerts counted on `day`, as seen from `today`."""
+        if self.last_day is None or day > self.last_day or day <= today - self.window or day <= self.last_day - self.window:
+            return 0
+        return self.counts[day % self.window]
+
+    def total(self, today: int) -> int:
+        """Alerts in the window ending on `today`."""
+        return sum(self.count_on(day, today) for day in range(today - self.window + 1, today + 1))
+
+    def active_days(self, today: int) -> int:
+        """Days with at least one alert in the window ending on `today`."""
+        return sum(1 for day in range(today - self.window + 1, today + 1) if self.count_on(day, today))
+
+    def streak(self, today: int) -> int:
+        """Consecutive days with alerts ending on `today` (capped at the window)."""
+        length = 0
+        for day in range(today, today - self.window, -1):
+            if not self.count_on(day, today):
+                break
+            length += 1
+        return length
@@ -0,0 +1,113 @@
+"""
+On-disk TTL cache for GeoEdge alerts/history responses.
+Entries are content-addressed by (trigger_type_id, location_id, to bucket) and
+evicted least-recently-used once the cache directory grows past max_bytes.
+The window start is not part of the key: an entry serves any request whose
+`from` it covers (callers check entry["from"]), so an incremental rerun hits
+the entry written by the full-window run before it.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, Optional
+
+
+class ResponseCache:
+    """
+    File-per-entry response cache. A hit refreshes the file's access time,
+    which is what LRU eviction orders by; TTL is measured from when the entry was written.
+    """
+
+    def __init__(self, directory: str, ttl_seconds: int, max_bytes: int, bucket_seconds: int):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.bucket_seconds = max(bucket_seconds, 1)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0}
+        os.makedirs(directory, exist_ok=True)
+
+    def key_for(self, params: Dict[str, Any]) -> str:
+        """Content address for a request: trigger, sorted locations and bucketed `to`."""
+        locations = ",".join(sorted(code.strip() for code in str(params["location_id"]).split(",")))
+        key_source = json.dumps(
+            [
+                str(params["trigger_type_id"]),
+                locations,
+                int(params["to"]) // self.bucket_seconds,
+            ]
+        )
+        return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _count(self, stat: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[stat] += amount
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for key, or None on miss/expiry."""
+        path = self._path(key)
+        try:
+            written_at = os.stat(path).st_mtime
+            if time.time() - written_at > self.ttl_seconds:
+                os.remove(path)
+                self._count("expired")
+                self._count("misses")
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path, (time.time(), written_at))  # mark as recently used, keep the TTL clock
+        except (OSError, ValueError):
+            self._count("misses")
+            return None
+
+        self._count("hits")
+        return entry
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        """Store an entry and evict least-recently-used entries beyond max_bytes."""
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        self._evict()
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = []
+            total = 0
+            for name in os.listdir(self.directory):
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_atime, stat.st_size, name))
+                total += stat.st_size
+
+            if total <= self.max_bytes:
+                return
+            for _, size, name in sorted(entries):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                self._stats["evicted"] += 1
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of hit/miss/expiry/eviction counters since the cache was created."""
+        with self._lock:
+            return dict(self._stats)
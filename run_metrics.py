@@ -0,0 +1,147 @@
+"""
+Per-stage timing spans and counters for alert flows.
+Each flow records into a FlowMetrics bound to its thread; finished flows are
+appended to a JSONL metrics file, one record per flow per run.
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, Optional
+
+RUN_METRICS_FILE = "run_metrics.jsonl"
+
+_CURRENT = threading.local()
+_WRITE_LOCK = threading.Lock()
+_run_id: Optional[str] = None
+
+
+def set_run_id(run_id: Optional[str]) -> None:
+    """Run id stamped on every flow record (main() uses the log index run id so the two can be joined)."""
+    global _run_id
+    _run_id = run_id
+
+
+class FlowMetrics:
+    """
+    Stage durations and counters for one flow. Thread-safe, so worker threads started by the flow
+    (see bind_metrics) can record into it. Counters named <x>_hits with a matching <x>_lookups also get <x>_hit_rate.
+    """
+
+    def __init__(self, flow: str):
+        self.flow = flow
+        self.run_id = _run_id
+        self.started = time.time()
+        self._started_perf = time.perf_counter()
+        self._lock = threading.Lock()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, float] = {}
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """Time a stage; repeated spans of the same stage add up."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                totals = self.stages.setdefault(stage, {"seconds": 0.0, "calls": 0})
+                totals["seconds"] += elapsed
+                totals["calls"] += 1
+
+    def count(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record(self) -> Dict[str, Any]:
+        """JSON-ready snapshot of this flow's metrics."""
+        with self._lock:
+            counters = dict(self.counters)
+            stages = {name: {"seconds": round(t["seconds"], 4), "calls": t["calls"]} for name, t in self.stages.items()}
+        for name in list(counters):
+            if name.endswith("_hits"):
+                prefix = name[: -len("_hits")]
+                lookups = counters.get(f"{prefix}_lookups")
+                if lookups:
+                    counters[f"{prefix}_hit_rate"] = round(counters[name] / lookups, 4)
+        return {
+            "run_id": self.run_id,
+            "flow": self.flow,
+            "started": datetime.fromtimestamp(self.started, timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+            "duration_seconds": round(time.perf_counter() - self._started_perf, 4),
+            "stages": stages,
+            "counters": counters,
+        }
+
+    def summary(self) -> str:
+        """One-line stage timing summary for the log."""
+        with self._lock:
+            return ", ".join(f"{name} {t['seconds']:.2f}s" for name, t in self.stages.items())
+
+    def write(self, path: Optional[str] = None) -> None:
+        """Append this flow's record to the metrics file."""
+        line = json.dumps(self.record(), default=str)
+        with _WRITE_LOCK:
+            with open(path or RUN_METRICS_FILE, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+def current_metrics() -> Optional[FlowMetrics]:
+    return getattr(_CURRENT, "metrics", None)
+
+
+@contextmanager
+def flow_metrics(flow: str, path: Optional[str] = None) -> Iterator[FlowMetrics]:
+    """Bind a new FlowMetrics to this thread for the block and write it to the metrics file on exit."""
+    metrics = FlowMetrics(flow)
+    with use_metrics(metrics):
+        try:
+            yield metrics
+        finally:
+            try:
+                metrics.write(path)
+            except OSError:
+                pass
+
+
+@contextmanager
+def use_metrics(metrics: Optional[FlowMetrics]) -> Iterator[None]:
+    """Bind metrics to the current thread for the block (restoring whatever was bound before)."""
+    previous = current_metrics()
+    _CURRENT.metrics = metrics
+    try:
+        yield
+    finally:
+        _CURRENT.metrics = previous
+
+
+def bind_metrics(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap fn so it records into the calling thread's metrics when run on a worker thread."""
+    metrics = current_metrics()
+
+    def bound(*args: Any, **kwargs: Any) -> Any:
+        with use_metrics(metrics):
+            return fn(*args, **kwargs)
+
+    return bound
+
+
+@contextmanager
+def record_span(stage: str) -> Iterator[None]:
+    """Time a stage into the thread's current flow metrics (no-op outside a flow)."""
+    metrics = current_metrics()
+    if metrics is None:
+        yield
+        return
+    with metrics.span(stage):
+        yield
+
+
+def record_count(name: str, amount: float = 1) -> None:
+    """Add to a counter of the thread's current flow metrics (no-op outside a flow)."""
+    metrics = current_metrics()
+    if metrics is not None:
+        metrics.count(name, amount)
@@ -0,0 +1,124 @@
+"""
+Process-pool sharded matching and grouping for very large alert days.
+Alerts are partitioned by a stable hash (crc32, not the per-process salted hash()) and each
+worker gets a read-only snapshot through its pool initializer, which fork start methods
+inherit without pickling. Shards return alert positions, so the merge is deterministic and
+the output is the same as the in-process loops.
+"""
+
+import heapq
+import multiprocessing
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from alert_records import AlertRecord
+from country_masks import country_mask, locations_mask
+
+SHARDS_PER_WORKER = 4  # More shards than workers evens out skewed projects/accounts
+
+_SNAPSHOT: Any = None
+
+
+def _init_worker(snapshot: Any) -> None:
+    global _SNAPSHOT
+    _SNAPSHOT = snapshot
+
+
+def shard_of(key: Any, shard_count: int) -> int:
+    """Stable shard for a project/account id (same in every process and run)."""
+    return zlib.crc32(str(key).encode("utf-8")) % shard_count
+
+
+def _partition(keys: Iterable[Any], shard_count: int) -> List[List[int]]:
+    """Positions of keys per shard, ascending within each shard; empty shards dropped."""
+    shards: List[List[int]] = [[] for _ in range(shard_count)]
+    for position, key in enumerate(keys):
+        shards[shard_of(key, shard_count)].append(position)
+    return [shard for shard in shards if shard]
+
+
+def _match_shard(positions: List[int]) -> Tuple[array, array, int, int, int]:
+    """Worker: (alert positions, row indexes) of matches plus the skip counters for one shard."""
+    alert_project_ids, project_data, active_campaign_ids, target_countries = _SNAPSHOT
+    # Country bits are interned per process, so the target mask is built here, not sent
+    target_mask = country_mask(target_countries)
+    match_alerts = array("q")
+    match_rows = array("q")
+    skipped_inactive = 0
+    skipped_off_target = 0
+    missing_project_data = 0
+    for position in positions:
+        project_id = alert_project_ids[position]
+        if project_id not in project_data:
+            missing_project_data += 1
+            continue
+        for row_index, result in enumerate(project_data[project_id]):
+            if result["campaign_id"] not in active_campaign_ids:
+                skipped_inactive += 1
+                continue
+            locations = result["locations"]
+            if locations and not locations_mask(locations) & target_mask:
+                skipped_off_target += 1
+                continue
+            match_alerts.append(position)
+            match_rows.append(row_index)
+    return match_alerts, match_rows, skipped_inactive, skipped_off_target, missing_project_data
+
+
+def match_alerts_sharded(
+    filtered_alerts: List[AlertRecord],
+    project_data: Dict[str, List[Dict[str, Any]]],
+    active_campaign_ids: Set[Any],
+    target_countries: Set[str],
+    workers: int,
+) -> Tuple[List[AlertRecord], int, int, int]:
+    """
+    Join filtered alerts with their project rows across a process pool, sharded by project_id.
+    Returns (matching alerts, skipped inactive, skipped off-target, alerts without project data).
+    """
+    alert_project_ids = [alert.project_id for alert in filtered_alerts]
+    shards = _partition(alert_project_ids, workers * SHARDS_PER_WORKER)
+    snapshot = (alert_project_ids, project_data, active_campaign_ids, target_countries)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(snapshot,)) as executor:
+        shard_results = list(executor.map(_match_shard, shards))
+
+    # Each shard is ascending by (alert position, row index): a k-way merge restores loop order
+    merged = heapq.merge(*(zip(match_alerts, match_rows) for match_alerts, match_rows, *_ in shard_results))
+    matching_alerts = []
+    for position, row_index in merged:
+        alert = filtered_alerts[position]
+        matching_alerts.append(alert.with_row(project_data[alert.project_id][row_index]))
+    skipped_inactive = sum(result[2] for result in shard_results)
+    skipped_off_target = sum(result[3] for result in shard_results)
+    missing_project_data = sum(result[4] for result in shard_results)
+    return matching_alerts, skipped_inactive, skipped_off_target, missing_project_data
+
+
+def _group_shard(positions: List[int]) -> List[Tuple[int, str, Dict[str, Any]]]:
+    """Worker: (position of first alert, group key, group) for every group in one shard."""
+    group_alerts, region_alerts = _SNAPSHOT
+    first_seen: Dict[str, int] = {}
+    grouped = group_alerts([region_alerts[position] for position in positions], first_seen)
+    return [(positions[first_seen[key]], key, group) for key, group in grouped.items()]
+
+
+def group_alerts_sharded(
+    region_alerts: List[Dict[str, Any]],
+    group_alerts: Callable[[List[Dict[str, Any]], Optional[Dict[str, int]]], Dict[str, Dict[str, Any]]],
+    workers: int,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run group_alerts (main.group_alerts_for_report) across a process pool, sharded by account_id.
+    Group keys start with the account id, so every group is built whole inside one shard and
+    the merge only has to restore first-appearance order.
+    """
+    shards = _partition((alert.get("account_id", "Unknown") for alert in region_alerts), workers * SHARDS_PER_WORKER)
+    if multiprocessing.get_start_method() != "fork":
+        # The snapshot is pickled to each worker; plain dicts round-trip, slotted records' sentinels don't
+        region_alerts = [dict(alert) for alert in region_alerts]
+    snapshot = (group_alerts, region_alerts)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(snapshot,)) as executor:
+        shard_results = list(executor.map(_group_shard, shards))
+    return {key: group for _, key, group in heapq.merge(*shard_results, key=lambda entry: entry[0])}
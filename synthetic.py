@@ -0,0 +1,240 @@
+"""
+Synthetic GeoEdge alerts and in-memory MySQL/Vertica stand-ins.
+Used by benchmark.py (and the load harness) to exercise the processing path without
+the GeoEdge API or the databases. Everything is seeded, so the same arguments always
+produce the same data.
+"""
+
+import hashlib
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from config import (
+    COUNTRY_DISPLAY,
+    GEOEDGE_TRIGGER_TYPES,
+    GREATER_CHINA_COUNTRIES,
+    LATAM_COUNTRIES,
+    TARGET_LOCATIONS,
+    TARGET_LOCATIONS_ESIT,
+)
+
+# Alert locations: mostly the flows' target countries, plus some the flows ignore
+_OTHER_LOCATIONS = {"DE": "Germany", "FR": "France", "JP": "Japan", "BR": "Brazil", "IN": "India"}
+_LOCATION_NAMES = {
+    code: COUNTRY_DISPLAY.get(code, code).split(" ", 1)[-1]
+    for code in sorted(TARGET_LOCATIONS | TARGET_LOCATIONS_ESIT)
+}
+_LOCATION_NAMES.update(_OTHER_LOCATIONS)
+_CAMPAIGN_LOCATION_POOL = sorted(TARGET_LOCATIONS | TARGET_LOCATIONS_ESIT | {"DE", "FR", "JP", "MX"})
+
+
+def _hex_id(rng: random.Random) -> str:
+    return "%032x" % rng.getrandbits(128)
+
+
+def generate_alerts(
+    count: int,
+    seed: int = 0,
+    project_count: Optional[int] = None,
+    target_share: float = 0.8,
+    window_hours: int = 24,
+    now: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Alerts shaped like the GeoEdge alerts/history response after fetch_alerts_from_geoedge
+    (location / project_name dicts, trigger_type_name added). target_share of them are in a
+    target country; project ids are drawn from project_count projects (default count // 5).
+    """
+    rng = random.Random(seed)
+    now = now or datetime(2026, 1, 1, tzinfo=timezone.utc)
+    project_count = max(project_count or count // 5, 1)
+    trigger_ids = list(GEOEDGE_TRIGGER_TYPES)
+    target_codes = sorted(TARGET_LOCATIONS | TARGET_LOCATIONS_ESIT)
+    other_codes = sorted(_OTHER_LOCATIONS)
+    alert_ids = [_hex_id(rng) for _ in range(max(count // 50, 1))]
+
+    alerts = []
+    for i in range(count):
+        trigger_id = rng.choice(trigger_ids)
+        code = rng.choice(target_codes) if rng.random() < target_share else rng.choice(other_codes)
+        project_id = f"{rng.randrange(project_count):06d}"
+        history_id = f"{i:08x}{rng.getrandbits(64):016x}"
+        alerts.append(
+            {
+                "alert_id": rng.choice(alert_ids),
+                "history_id": history_id,
+                "trigger_type_id": trigger_id,
+                "trigger_type_name": GEOEDGE_TRIGGER_TYPES[trigger_id],
+                "alert_name": f"{GEOEDGE_TRIGGER_TYPES[trigger_id]} alert",
+                "event_datetime": (now - timedelta(seconds=rng.randrange(window_hours * 3600))).strftime("%Y-%m-%d %H:%M:%S"),
+                "location": {code: _LOCATION_NAMES[code]},
+                "project_name": {project_id: f"Project {project_id}"},
+                "alert_details_url": f"https://site.geoedge.com/analyticsv2/alertshistory/details/{history_id}",
+            }
+        )
+    return alerts
+
+
+def generate_project_rows(
+    project_ids: Sequence[str],
+    seed: int = 0,
+    match_share: float = 0.3,
+    max_campaigns: int = 3,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    MySQL enrichment rows ({project_id: rows}) in the shape _project_rows_sql returns.
+    match_share of the projects belong to LATAM/Greater China publishers (the rest have no rows).
+    """
+    rng = random.Random(seed + 1)
+    publisher_countries = sorted(LATAM_COUNTRIES | GREATER_CHINA_COUNTRIES)
+    rows_by_project: Dict[str, List[Dict[str, Any]]] = {}
+    for project_id in sorted(set(project_ids)):
+        if rng.random() >= match_share:
+            continue
+        country = rng.choice(publisher_countries)
+        account_id = rng.randrange(1_000_000, 9_999_999)
+        rows = []
+        for _ in range(rng.randint(1, max_campaigns)):
+            locations = rng.sample(_CAMPAIGN_LOCATION_POOL, rng.randint(1, 4))
+            rows.append(
+                {
+                    "project_id": project_id,
+                    "campaign_id": rng.randrange(10_000_000, 99_999_999),
+                    "account_id": account_id,
+                    "account_name": f"Publisher {account_id}",
+                    "country": country,
+                    "publisher_name": f"Publisher {account_id}",
+                    "locations": (", " if rng.random() < 0.3 else ",").join(locations),
+                    "region_type": "LATAM" if country in LATAM_COUNTRIES else "Greater China",
+                }
+            )
+        rows_by_project[project_id] = rows
+    return rows_by_project
+
+
+def pick_active_campaigns(
+    rows_by_project: Dict[str, List[Dict[str, Any]]],
+    seed: int = 0,
+    active_share: float = 0.8,
+) -> Set[int]:
+    """Campaign ids that the fake Vertica reports as APPROVED + RUNNING."""
+    rng = random.Random(seed + 2)
+    return {
+        row["campaign_id"]
+        for rows in rows_by_project.values()
+        for row in rows
+        if rng.random() < active_share
+    }
+
+
+def generate_dataset(count: int, seed: int = 0) -> Tuple[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]], Set[int]]:
+    """Alerts, MySQL rows for their projects and the active campaign set, all from one seed."""
+    alerts = generate_alerts(count, seed=seed)
+    project_ids = [next(iter(alert["project_name"])) for alert in alerts]
+    rows_by_project = generate_project_rows(project_ids, seed=seed)
+    return alerts, rows_by_project, pick_active_campaigns(rows_by_project, seed=seed)
+
+
+def dataset_fingerprint(alerts: List[Dict[str, Any]]) -> str:
+    """Short hash of the alert ids, printed with results so runs can be checked for identical input."""
+    digest = hashlib.sha256()
+    for alert in alerts:
+        digest.update(alert["history_id"].encode("ascii"))
+    return digest.hexdigest()[:12]
+
+
+class _FakeCursor:
+    def __init__(self, execute):
+        self._execute = execute
+        self._rows: List[Any] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, sql: str, params: Optional[Sequence[Any]] = None, **kwargs: Any) -> None:
+        self._rows = self._execute(sql, list(params or []))
+
+    def fetchall(self) -> List[Any]:
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchmany(self, size: int = 1) -> List[Any]:
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def close(self) -> None:
+        pass
+
+
+class _FakeConnection:
+    def __init__(self, execute):
+        self._execute = execute
+
+    def cursor(self, *args: Any) -> _FakeCursor:
+        return _FakeCursor(self._execute)
+
+    def ping(self, reconnect: bool = False) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class FakeMySQL:
+    """In-memory stand-in for the MySQL enrichment join: the bound parameters are the project ids."""
+
+    def __init__(self, rows_by_project: Dict[str, List[Dict[str, Any]]]):
+        self.rows_by_project = rows_by_project
+        self.queries = 0
+
+    def _execute(self, sql: str, params: List[Any]) -> List[Dict[str, Any]]:
+        self.queries += 1
+        return [dict(row) for project_id in dict.fromkeys(params) for row in self.rows_by_project.get(project_id, [])]
+
+    def connect(self) -> _FakeConnection:
+        return _FakeConnection(self._execute)
+
+
+class FakeVertica:
+    """In-memory stand-in for the Vertica status check: returns the bound campaign ids that are active."""
+
+    def __init__(self, active_campaign_ids: Set[int]):
+        self.active_campaign_ids = set(active_campaign_ids)
+        self.queries = 0
+
+    def _execute(self, sql: str, params: List[Any]) -> List[Tuple[Any]]:
+        self.queries += 1
+        if not params:  # health check
+            return [(1,)]
+        return [(cid,) for cid in dict.fromkeys(params) if cid in self.active_campaign_ids]
+
+    def connect(self) -> _FakeConnection:
+        return _FakeConnection(self._execute)
+
+
+def install_fake_databases(
+    main_module: Any,
+    rows_by_project: Dict[str, List[Dict[str, Any]]],
+    active_campaign_ids: Set[int],
+) -> Tuple[FakeMySQL, FakeVertica]:
+    """
+    Point main's MySQL/Vertica connection factories at in-memory fakes and reset its pools and
+    in-process caches. The local alert store is left as is; callers that want cold caches
+    should also replace main_module.get_alert_store.
+    """
+    mysql, vertica = FakeMySQL(rows_by_project), FakeVertica(active_campaign_ids)
+    main_module.close_db_pools()
+    main_module.get_database_connection = mysql.connect
+    main_module.get_vertica_connection = vertica.connect
+    reset_caches(main_module)
+    return mysql, vertica
+
+
+def reset_caches(main_module: Any) -> None:
+    """Clear main's in-process campaign status cache so repeated runs start cold."""
+    with main_module._CAMPAIGN_STATUS_LOCK:
+        main_module._CAMPAIGN_STATUS_CACHE.clear()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming GeoEdge response parser (iter_alerts_from_json_chunks)
+"""
+
+import json
+import os
+import sys
+import unittest
+
+# Add the current directory to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import iter_alerts_from_json_chunks
+
+FIELDS = ("alert_id", "location", "project_name")
+
+ALERTS = [
+    {"alert_id": "a1", "location": {"BR": "Brasil — São Paulo"}, "project_name": {"p1": "Proj 🚀"}, "extra": [1, 2]},
+    {"alert_id": "a2", "location": {"CN": "中国"}, "project_name": {"p2": "项目"}},
+    {"alert_id": 12345, "location": {}, "project_name": {}},
+]
+
+
+def chunked(body: bytes, size: int):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+def parse(body: bytes, size: int):
+    return list(iter_alerts_from_json_chunks(chunked(body, size), FIELDS))
+
+
+def projected(alerts):
+    return [{field: alert[field] for field in FIELDS if field in alert} for alert in alerts]
+
+
+class IterAlertsFromJsonChunksTest(unittest.TestCase):
+    def test_top_level_and_response_wrapped_bodies(self):
+        for payload in ({"alerts": ALERTS, "total": 3}, {"status": "ok", "response": {"count": 3, "alerts": ALERTS}}):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.assertEqual(parse(body, 1 << 16), projected(ALERTS))
+
+    def test_every_chunk_boundary(self):
+        # 1-byte chunks split every token and every multi-byte UTF-8 sequence
+        body = json.dumps({"total": 1234567, "flag": True, "alerts": ALERTS}, ensure_ascii=False).encode("utf-8")
+        for size in (1, 2, 3, 5, 7, 64):
+            self.assertEqual(parse(body, size), projected(ALERTS), f"chunk size {size}")
+
+    def test_nested_alerts_keys_are_skipped(self):
+        body = json.dumps(
+            {"summary": {"alerts": [{"x": 1}]}, "meta": [{"alerts": []}], "alerts": ALERTS}, ensure_ascii=False
+        ).encode("utf-8")
+        for size in (1, 16, 1 << 16):
+            self.assertEqual(parse(body, size), projected(ALERTS), f"chunk size {size}")
+
+    def test_nested_alerts_inside_response_are_skipped(self):
+        body = json.dumps({"response": {"summary": {"alerts": [{"x": 1}]}, "alerts": ALERTS}}).encode("utf-8")
+        self.assertEqual(parse(body, 4), projected(ALERTS))
+
+    def test_body_without_alerts(self):
+        self.assertEqual(parse(b'{"status": "ok", "summary": {"alerts": [{"x": 1}]}}', 3), [])
+        self.assertEqual(parse(b'{"response": {}}', 3), [])
+        self.assertEqual(parse(b"[]", 3), [])
+
+    def test_truncated_body_raises(self):
+        body = json.dumps({"alerts": ALERTS}).encode("utf-8")
+        with self.assertRaises(ValueError):
+            parse(body[:-2], 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,29 +5,40 @@ Test script to preview how the campaign grouping looks in the email
 
 import sys
 import os
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Any
 
 # Add the current directory to Python path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from config import TARGET_LOCATIONS
-from main import fetch_alerts_from_geoedge, process_alerts_to_target_regions, generate_alert_email_html
+from config import TARGET_LOCATIONS, ALERT_CHECK_HOURS
+from alert_store import AlertStore
+from main import ALERT_FLOWS, fetch_alerts_from_geoedge, process_alerts_to_target_regions, generate_alert_email_html
 
 def main():
     """Generate a preview of how the grouped alerts look"""
     
+    # --from-store: render from the enriched alerts saved by the last main.py run (no GeoEdge/MySQL/Vertica calls)
+    from_store = "--from-store" in sys.argv[1:]
+
     print("📧 Generating alert email preview with grouping...")
     
     try:
-        # Step 1: Get alerts from GeoEdge API for primary target set
         target_label = "/".join(sorted(TARGET_LOCATIONS))
-        target_csv = ",".join(sorted(TARGET_LOCATIONS))
-        raw_alerts = fetch_alerts_from_geoedge(target_csv, "Preview")
-        print(f"✅ Found {len(raw_alerts)} total alerts")
-        
-        # Step 2: Process and filter alerts  
-        filtered_alerts = process_alerts_to_target_regions(raw_alerts, TARGET_LOCATIONS)
-        print(f"✅ Found {len(filtered_alerts)} matching regional alerts")
+        if from_store:
+            # Step 1+2: Read enriched alerts for the primary flow from the local alert store
+            since = datetime.now(timezone.utc) - timedelta(hours=ALERT_CHECK_HOURS)
+            filtered_alerts = AlertStore().query_enriched_alerts(ALERT_FLOWS[0]["flow_name"], int(since.timestamp()))
+            print(f"✅ Loaded {len(filtered_alerts)} matching regional alerts from the local alert store")
+        else:
+            # Step 1: Get alerts from GeoEdge API for primary target set
+            target_csv = ",".join(sorted(TARGET_LOCATIONS))
+            raw_alerts = fetch_alerts_from_geoedge(target_csv, "Preview")
+            print(f"✅ Found {len(raw_alerts)} total alerts")
+            
+            # Step 2: Process and filter alerts  
+            filtered_alerts = process_alerts_to_target_regions(raw_alerts, TARGET_LOCATIONS)
+            print(f"✅ Found {len(filtered_alerts)} matching regional alerts")
         
         if filtered_alerts:
             # Step 3: Generate HTML preview
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for recurrence frequency/streak counting (tag_recurrence) against a throwaway alert store
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+# Add the current directory to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import main
+from alert_store import AlertStore
+
+
+def alert(history_id: str, event_time: datetime, campaign_id: int = 1) -> dict:
+    return {
+        "history_id": history_id,
+        "campaign_id": campaign_id,
+        "trigger_type_name": "Malicious",
+        "event_datetime": event_time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+class TagRecurrenceTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.saved = (main._ALERT_STORE, main._HISTORY_MIGRATED)
+        main._ALERT_STORE = AlertStore(os.path.join(self.tmpdir.name, "alert_store.db"))
+        main._HISTORY_MIGRATED = True
+        self.now = datetime.now(timezone.utc)
+
+    def tearDown(self):
+        main._ALERT_STORE, main._HISTORY_MIGRATED = self.saved
+        self.tmpdir.cleanup()
+
+    def tag(self, alerts):
+        main.tag_recurrence(alerts)
+        return [(a["recurrence_frequency"], a["recurrence_streak"]) for a in alerts]
+
+    def test_rerun_of_the_same_window_does_not_recount(self):
+        alerts = [alert("h1", self.now), alert("h2", self.now)]
+        self.assertEqual(self.tag(alerts), [(2, 1), (2, 1)])
+        rerun = [alert("h1", self.now), alert("h2", self.now)]
+        self.assertEqual(self.tag(rerun), [(2, 1), (2, 1)])
+
+    def test_second_flow_does_not_recount_shared_events(self):
+        self.assertEqual(self.tag([alert("h1", self.now)]), [(1, 1)])
+        # The same campaign event reported by the second flow, plus one newer event
+        later = self.now + timedelta(seconds=1)
+        self.assertEqual(self.tag([alert("h1", self.now), alert("h3", later)]), [(2, 1), (2, 1)])
+
+    def test_second_flow_counts_a_distinct_older_event(self):
+        self.assertEqual(self.tag([alert("h1", self.now)]), [(1, 1)])
+        # A different event for the same campaign|trigger, earlier than the one already counted
+        earlier = self.now - timedelta(hours=3)
+        self.assertEqual(self.tag([alert("h2", earlier)]), [(2, 1 if earlier.date() == self.now.date() else 2)])
+
+    def test_events_are_bucketed_by_event_day(self):
+        yesterday = self.now - timedelta(days=1)
+        self.assertEqual(self.tag([alert("h1", yesterday), alert("h2", self.now)]), [(2, 2), (2, 2)])
+        three_days_ago = self.now - timedelta(days=3)
+        self.assertEqual(self.tag([alert("h3", three_days_ago, campaign_id=2)]), [(1, 0)])
+
+    def test_one_event_matching_several_campaign_rows_counts_once(self):
+        self.assertEqual(self.tag([alert("h1", self.now), alert("h1", self.now)]), [(1, 1), (1, 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for the GeoEdge response cache on the incremental fetch path (fake GeoEdge API, throwaway store)
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Add the current directory to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import main
+from alert_store import AlertStore
+from fake_services import FakeGeoEdgeServer
+from response_cache import ResponseCache
+
+DAY_SECONDS = 86400
+
+
+class IncrementalFetchCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        # main logs to alert_checker.log in the working directory
+        self.cwd = os.getcwd()
+        os.chdir(self.tmpdir.name)
+        self.geoedge = FakeGeoEdgeServer(alerts_per_request=50, project_count=20).start()
+        # One bucket per day, so both fetches below land in the same `to` bucket
+        cache = ResponseCache(os.path.join(self.tmpdir.name, "cache"), 3600, 10 * 1024 * 1024, DAY_SECONDS)
+        store = AlertStore(os.path.join(self.tmpdir.name, "alert_store.db"))
+        self.patches = [
+            mock.patch.dict(os.environ, {"GEOEDGE_API_KEY": "test", "GEOEDGE_API_BASE": self.geoedge.base_url}),
+            mock.patch.object(main, "get_response_cache", lambda: cache),
+            mock.patch.object(main, "_ALERT_STORE", store),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+        self.geoedge.stop()
+        os.chdir(self.cwd)
+        self.tmpdir.cleanup()
+
+    def test_incremental_rerun_in_the_same_bucket_makes_no_requests(self):
+        first = main.fetch_alerts_from_geoedge(incremental=True, shard_hours=0)
+        requests_after_first = self.geoedge.stats["requests"]
+        self.assertEqual(requests_after_first, len(main.GEOEDGE_TRIGGER_TYPES))
+
+        # The rerun asks from the watermark (minus the overlap), not from now-24h
+        second = main.fetch_alerts_from_geoedge(incremental=True, shard_hours=0)
+        self.assertEqual(self.geoedge.stats["requests"], requests_after_first)
+        self.assertEqual(len(second), len(first))
+
+
+if __name__ == "__main__":
+    unittest.main()